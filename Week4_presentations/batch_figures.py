@@ -0,0 +1,182 @@
+# Config-driven batch figure generation: one figure set per country in the spec, rendered in a process pool
+#
+#   python batch_figures.py --spec figure_spec.json --workers 8
+import argparse
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")  # workers only write files
+import numpy as np
+
+from rol_panel import Panel
+import plot_rol_figures as figs
+from build_manifest import MANIFEST_NAME, BuildManifest, code_version, entity_rows, figure_key, slice_hash
+
+_PANEL = None  # set in each worker by _attach_panel
+_SHM = None
+
+
+def load_spec(path):
+    # JSON spec; YAML is accepted too when PyYAML is installed
+    path = Path(path)
+    with open(path) as f:
+        if path.suffix.lower() in (".yml", ".yaml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is needed for YAML specs (pip install pyyaml), or use JSON")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def expand_entries(spec, panel):
+    # explicit countries first, then (optionally) every other entity with the shared defaults
+    entries = [dict(e) for e in spec.get("countries", [])]
+    defaults = spec.get("all_entities", {})
+    if defaults.get("enabled"):
+        listed = {e["entity"] for e in entries}
+        has_data = ~np.all(np.isnan(panel.values), axis=1)
+        for name, ok in zip(panel.entities, has_data):
+            if ok and name not in listed:
+                entry = {k: v for k, v in defaults.items() if k != "enabled"}
+                entry["entity"] = name
+                entries.append(entry)
+    return entries
+
+
+def jobs_for(entry, outdir):
+    # (figure kind, output path) for everything this entry can produce
+    folder = Path(outdir) / slug(entry["entity"])
+    start, end = entry["period"]
+    jobs = [("timeline", folder / f"timeline_{start}_{end}.png")]
+    if entry.get("regime_start") is not None:
+        jobs.append(("since_start", folder / f"since_{entry['regime_start']}.png"))
+        jobs.append(("since_start_pct", folder / f"since_{entry['regime_start']}_pct.png"))
+    if entry.get("pre") and entry.get("war"):
+        jobs.append(("pre_vs_war", folder / "pre_vs_war.png"))
+    return jobs
+
+
+def render(panel, kind, entry, outpath):
+    Path(outpath).parent.mkdir(parents=True, exist_ok=True)
+    if kind == "timeline":
+        return figs.fig_country_timeline(panel, entry, outpath)
+    if kind == "since_start":
+        return figs.fig_country_since_start(panel, entry, outpath)
+    if kind == "since_start_pct":
+        return figs.fig_country_since_start(panel, entry, outpath, pct=True)
+    if kind == "pre_vs_war":
+        return figs.fig_country_pre_vs_war(panel, entry, outpath)
+    raise ValueError(f"Unknown figure kind {kind!r}")
+
+
+#shared, read-only panel: the parent parses the CSV once and workers map the same memory
+
+def share_panel(panel):
+    shm = shared_memory.SharedMemory(create=True, size=panel.data.nbytes)
+    buf = np.ndarray(panel.data.shape, dtype=panel.data.dtype, buffer=shm.buf)
+    buf[:] = panel.data
+    meta = {
+        "shm": shm.name, "shape": panel.data.shape, "dtype": panel.data.dtype.str,
+        "entities": panel.entities, "years": panel.years.tolist(),
+        "indicators": panel.indicators, "active": panel.active,
+        "codes": [None] * len(panel.entities),
+    }
+    for code, i in panel.code_index.items():
+        meta["codes"][i] = code
+    return shm, meta
+
+
+def _attach_panel(meta):
+    global _PANEL, _SHM
+    figs.set_matplotlib_defaults()
+    _SHM = shared_memory.SharedMemory(name=meta["shm"])  # keep a reference so the buffer stays mapped
+    data = np.ndarray(meta["shape"], dtype=np.dtype(meta["dtype"]), buffer=_SHM.buf)
+    data.flags.writeable = False
+    _PANEL = Panel(data, meta["entities"], meta["years"], meta["codes"], meta["indicators"], meta["active"])
+
+
+def _render_job(kind, entry, outpath):
+    try:
+        ok = render(_PANEL, kind, entry, outpath)
+        return entry["entity"], kind, str(outpath), "ok" if ok else "no data"
+    except Exception as e:  # one bad country should not stop the batch
+        return entry["entity"], kind, str(outpath), f"error: {e}"
+
+
+def job_key(panel, kind, entry, code):
+    # hash of the entity's rows, the spec entry and the code version; unchanged key = figure is up to date
+    rows = entity_rows(panel, entry["entity"], stitch=bool(entry.get("stitch")))
+    return figure_key(slice_hash(panel, rows), {"kind": kind, "entry": entry}, code)
+
+
+def build_all(spec, panel, outdir, workers=None, force=False):
+    entries = expand_entries(spec, panel)
+    jobs = [(kind, entry, path) for entry in entries for kind, path in jobs_for(entry, outdir)]
+
+    #make-style skip: only jobs whose key changed (or whose PNG is missing) go to the pool
+    manifest = BuildManifest(Path(outdir) / MANIFEST_NAME)
+    code = code_version()
+    keys = {str(path): job_key(panel, kind, entry, code) for kind, entry, path in jobs}
+    results = [(entry["entity"], kind, str(path), "up to date") for kind, entry, path in jobs
+               if not force and manifest.is_fresh(path, keys[str(path)])]
+    fresh = {r[2] for r in results}
+    jobs = [job for job in jobs if str(job[2]) not in fresh]
+    if not jobs:
+        return sorted(results)
+
+    shm, meta = share_panel(panel)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_panel, initargs=(meta,)) as pool:
+            futures = [pool.submit(_render_job, kind, entry, path) for kind, entry, path in jobs]
+            for fut in as_completed(futures):
+                entity, kind, path, status = fut.result()
+                if status in ("ok", "no data"):
+                    manifest.record(path, keys[path], written=status == "ok")
+                results.append((entity, kind, path, status))
+    finally:
+        shm.close()
+        shm.unlink()
+        manifest.save()
+    return sorted(results)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Render rule-of-law figure sets for every country in a spec.")
+    ap.add_argument("--spec", default="figure_spec.json", help="JSON (or YAML) figure spec")
+    ap.add_argument("--csv", default=None, help="Override the CSV path in the spec")
+    ap.add_argument("--outdir", default=None, help="Override the output directory in the spec")
+    ap.add_argument("--indicator", default=None, help="Override the indicator in the spec")
+    ap.add_argument("--all", action="store_true", help="Also render every other entity using the spec defaults")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--force", action="store_true", help="Re-render every figure even if its inputs are unchanged")
+    args = ap.parse_args()
+
+    spec = load_spec(args.spec)
+    base = Path(args.spec).parent
+    csv_path = args.csv or base / spec.get("csv", "key-features-of-liberal-democracy.csv")
+    outdir = args.outdir or base / spec.get("outdir", "figures")
+    if args.all:
+        spec.setdefault("all_entities", {})["enabled"] = True
+
+    panel = figs.load_data(csv_path, args.indicator or spec.get("indicator", "Rule of Law index"))
+    results = build_all(spec, panel, outdir, args.workers, args.force)
+
+    failed = [r for r in results if r[3].startswith("error")]
+    print(f"Rendered {sum(r[3] == 'ok' for r in results)} figures into {outdir} "
+          f"({sum(r[3] == 'up to date' for r in results)} up to date, "
+          f"{sum(r[3] == 'no data' for r in results)} skipped for missing data, {len(failed)} failed)")
+    for entity, kind, path, status in failed:
+        print(f"  {entity} {kind}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Make-style build manifest: a figure is re-rendered only when its data slice, parameters or code changed
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+
+from lineage import lineage_rows
+
+MANIFEST_NAME = ".figure_manifest.json"
+# every local module the rendered figures depend on (batch_figures renders the per-country sets)
+_CODE_FILES = ("plot_rol_figures.py", "batch_figures.py", "build_manifest.py", "rol_panel.py", "event_study.py",
+               "period_windows.py", "lineage.py", "label_layout.py")
+
+
+def code_version(files=_CODE_FILES):
+    # sha256 of the plotting/panel sources plus the matplotlib version: any code edit rebuilds everything
+    here = Path(__file__).parent
+    h = hashlib.sha256(matplotlib.__version__.encode())
+    for name in files:
+        h.update(name.encode())
+        h.update((here / name).read_bytes())
+    return h.hexdigest()
+
+
+def entity_rows(panel, entity, stitch=False):
+    # the panel rows a figure for this entity reads (stitched figures also read its lineage)
+    if stitch:
+        return lineage_rows(panel, entity)
+    i = panel.entity_index.get(entity)
+    return [] if i is None else [i]
+
+
+def slice_hash(panel, rows):
+    """
+    sha256 of the active indicator's full rows for these entities (whole rows, not just the
+    plotted window, because baselines and gap fills interpolate from neighbouring years).
+    """
+    rows = sorted(set(rows))
+    h = hashlib.sha256()
+    h.update(str(panel.indicator).encode())
+    h.update(np.asarray(panel.years, dtype=np.int64).tobytes())
+    for i in rows:
+        h.update(panel.entities[i].encode())
+        h.update(np.ascontiguousarray(panel.values[i]).tobytes())
+    return h.hexdigest()
+
+
+def figure_key(data_hash, params, code):
+    blob = json.dumps({"data": data_hash, "params": params, "code": code}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class BuildManifest:
+    """
+    JSON file mapping each output PNG (relative to the manifest's folder) to the key it was
+    built from and whether a file was written. A figure is fresh when its key is unchanged and
+    the PNG still exists (or the last build had no data to plot, so there is nothing to redo).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self.entries = json.load(f).get("figures", {})
+            except (OSError, ValueError):
+                self.entries = {}  # unreadable manifest: rebuild everything rather than fail
+
+    def _name(self, outpath):
+        return os.path.relpath(Path(outpath).resolve(), self.path.parent.resolve())
+
+    def is_fresh(self, outpath, key):
+        entry = self.entries.get(self._name(outpath))
+        if not entry or entry[0] != key:
+            return False
+        return Path(outpath).exists() or not entry[1]
+
+    def record(self, outpath, key, written=True):
+        self.entries[self._name(outpath)] = [key, bool(written)]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"figures": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)  # atomic, an interrupted run leaves the old manifest intact
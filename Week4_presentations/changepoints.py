@@ -0,0 +1,175 @@
+# Change-point detection (penalised mean-shift segmentation) for every entity x indicator series, in a process pool
+#
+#   python changepoints.py --csv key-features-of-liberal-democracy.csv --out breakpoints.csv
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from rol_panel import load_panel, short_label
+
+
+def segment_batch(Y, lengths, penalties, min_size=3):
+    """
+    Exact penalised mean-shift segmentation (the optimum PELT finds) for many series at once.
+
+    Y         - (S, n) series, left-aligned; row i uses its first lengths[i] values
+    penalties - per-series cost of adding a segment
+
+    Minimises the squared error around each segment mean plus penalty per segment, with
+    segments of at least min_size points. Segment costs come from running sums (O(1) each)
+    and every step of the dynamic programme is one array operation over all series and all
+    candidate starts, which beats pruning series one by one in a Python loop at these lengths
+    (n ~ 235). Returns, per series, the start index of every segment after the first.
+    """
+    Y = np.asarray(Y, dtype=float)
+    n_series, n = Y.shape
+    lengths = np.asarray(lengths, dtype=int)
+    penalties = np.asarray(penalties, dtype=float)
+    rows = np.arange(n_series)
+    c1 = np.zeros((n_series, n + 1))
+    c2 = np.zeros((n_series, n + 1))
+    np.cumsum(Y, axis=1, out=c1[:, 1:])
+    np.cumsum(Y * Y, axis=1, out=c2[:, 1:])
+
+    best = np.full((n_series, n + 1), np.inf)
+    best[:, 0] = -penalties
+    prev = np.zeros((n_series, n + 1), dtype=int)
+    for t in range(min_size, n + 1):
+        s = np.arange(t - min_size + 1)  # every start leaving a last segment of >= min_size
+        cost = (c2[:, t, None] - c2[:, s]) - (c1[:, t, None] - c1[:, s]) ** 2 / (t - s)
+        total = best[:, s] + cost
+        j = np.argmin(total, axis=1)
+        best[:, t] = total[rows, j] + penalties
+        prev[:, t] = j
+
+    out = []
+    for i in range(n_series):
+        breaks, t = [], lengths[i]
+        if t < 2 * min_size:
+            out.append([])
+            continue
+        while t > 0:
+            t = prev[i, t]
+            if t > 0:
+                breaks.append(int(t))
+        out.append(breaks[::-1])
+    return out
+
+
+def default_penalty(y, factor=3.0, floor=0.02):
+    # BIC-style: factor * sigma^2 * log(n), sigma from the MAD of first differences (robust to the steps)
+    diffs = np.diff(y)
+    sigma = np.median(np.abs(diffs - np.median(diffs))) / 0.6745 / np.sqrt(2) if len(diffs) else 0.0
+    return factor * max(sigma, floor) ** 2 * np.log(max(len(y), 2))
+
+
+def detect_block(years, block, penalty=None, min_size=3):
+    """
+    Breakpoints of year-aligned series (rows of block; NaN years are skipped). Returns one list
+    per row of (year, mean_before, mean_after), year being the first observed year of the new segment.
+    """
+    block = np.asarray(block, dtype=float)
+    years = np.asarray(years)
+    observed = [~np.isnan(v) for v in block]
+    lengths = np.array([m.sum() for m in observed])
+    packed = np.zeros((len(block), max(int(lengths.max(initial=0)), 1)))
+    for i, m in enumerate(observed):
+        packed[i, :lengths[i]] = block[i, m]
+    pens = [default_penalty(packed[i, :lengths[i]]) if penalty is None else penalty for i in range(len(block))]
+
+    out = []
+    for i, breaks in enumerate(segment_batch(packed, lengths, pens, min_size)):
+        if not breaks:
+            out.append([])
+            continue
+        y, yrs = packed[i, :lengths[i]], years[observed[i]]
+        bounds = [0] + breaks + [lengths[i]]
+        means = [float(y[a:b].mean()) for a, b in zip(bounds[:-1], bounds[1:])]
+        out.append([(int(yrs[b]), means[k], means[k + 1]) for k, b in enumerate(bounds[1:-1])])
+    return out
+
+
+def _detect_block(task):
+    # worker: one indicator x a slice of entities
+    indicator, entities, years, block, penalty, min_size = task
+    rows = []
+    for name, breaks in zip(entities, detect_block(years, block, penalty, min_size)):
+        rows.extend((name, indicator, year, before, after) for year, before, after in breaks)
+    return rows
+
+
+def detect_all(panel, penalty=None, min_size=3, min_delta=0.0, workers=None, chunks_per_indicator=4):
+    """
+    Run detect_block over every entity x indicator of the panel and return one table with
+    columns entity, indicator, year, before, after, delta (after - before), keeping breaks with
+    |delta| >= min_delta. Work is split into indicator x entity-slice tasks for a process pool;
+    workers=1 runs in this process.
+    """
+    bounds = np.linspace(0, len(panel.entities), chunks_per_indicator + 1).astype(int)
+    tasks = []
+    for k, indicator in enumerate(panel.indicators):
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            tasks.append((indicator, panel.entities[a:b], panel.years, np.asarray(panel.data[k, a:b], dtype=float),
+                          penalty, min_size))
+
+    if workers == 1:
+        parts = map(_detect_block, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_detect_block, tasks))
+    rows = [row for part in parts for row in part]
+
+    table = pd.DataFrame(rows, columns=["entity", "indicator", "year", "before", "after"])
+    table["delta"] = table["after"] - table["before"]
+    table = table[table["delta"].abs() >= min_delta]
+    return table.sort_values(["indicator", "entity", "year"]).reset_index(drop=True)
+
+
+def events_from_breakpoints(table, indicator, min_delta=0.1, direction=-1):
+    """
+    (entity, year) events for event_study.event_matrix / fig5_event_overlay: breaks in the
+    given indicator (exact name or a unique substring) whose change is at least min_delta in
+    `direction` (-1 declines, +1 rises, 0 either).
+    """
+    names = table["indicator"].unique()
+    hits = [n for n in names if n == indicator] or [n for n in names if indicator.lower() in n.lower()]
+    if len(hits) != 1:
+        raise KeyError(f"Indicator {indicator!r} matches {len(hits)} columns: {list(names)}")
+    rows = table[table["indicator"] == hits[0]]
+    delta = rows["delta"] * direction if direction else rows["delta"].abs()
+    rows = rows[delta >= min_delta]
+    return list(zip(rows["entity"], rows["year"].astype(int)))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Detect regime breakpoints in every entity x indicator series.")
+    ap.add_argument("--csv", default="key-features-of-liberal-democracy.csv")
+    ap.add_argument("--out", default="breakpoints.csv", help="Output table (CSV)")
+    ap.add_argument("--penalty", type=float, default=None, help="Fixed penalty per segment (default: per-series BIC-style)")
+    ap.add_argument("--min-size", type=int, default=3, help="Shortest segment in observed years")
+    ap.add_argument("--min-delta", type=float, default=0.05, help="Drop breaks with a smaller mean shift")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--overlay", default=None,
+                    help="Also save an event overlay of the detected Rule of Law declines to this PNG")
+    args = ap.parse_args()
+
+    panel = load_panel(args.csv)
+    table = detect_all(panel, args.penalty, args.min_size, args.min_delta, args.workers)
+    table.to_csv(args.out, index=False)
+    summary = table.groupby("indicator")["entity"].agg(["count", "nunique"])
+    summary.index = [short_label(i) for i in summary.index]
+    print(f"Saved {len(table)} breakpoints to {args.out}")
+    print(summary.rename(columns={"count": "breaks", "nunique": "entities"}).to_string())
+
+    if args.overlay:
+        import plot_rol_figures as figs
+        figs.set_matplotlib_defaults()
+        events = events_from_breakpoints(table, "Rule of Law", min_delta=0.1)
+        figs.fig5_event_overlay(panel.select("Rule of Law"), events, args.overlay)
+        print(f"Saved {args.overlay} ({len(events)} declines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Event-study engine: N (entity, start_year) events -> one N x horizon matrix of changes since t0
+import numpy as np
+
+
+def fill_gaps(values):
+    """
+    Linear interpolation across NaN gaps for every row at once (flat beyond the first/last
+    observation, like np.interp). Rows with no observations stay NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    n_rows, n_cols = values.shape
+    cols = np.arange(n_cols)
+    valid = ~np.isnan(values)
+
+    # index of the previous / next observed column for every cell
+    prev_idx = np.where(valid, cols, -1)
+    prev_idx = np.maximum.accumulate(prev_idx, axis=1)
+    next_idx = np.where(valid, cols, n_cols)
+    next_idx = np.minimum.accumulate(next_idx[:, ::-1], axis=1)[:, ::-1]
+
+    has_prev = prev_idx >= 0
+    has_next = next_idx < n_cols
+    prev_c = np.where(has_prev, prev_idx, np.where(has_next, next_idx, 0))
+    next_c = np.where(has_next, next_idx, prev_c)
+    rows = np.arange(n_rows)[:, None]
+    v0 = values[rows, prev_c]
+    v1 = values[rows, next_c]
+    span = next_c - prev_c
+    w = np.where(span > 0, (cols - prev_c) / np.maximum(span, 1), 0.0)
+    return v0 + w * (v1 - v0)
+
+
+def event_matrix(panel, events, horizon=12):
+    """
+    events: list of (entity, start_year). Returns a dict with
+      t      - 0..horizon (the common grid)
+      t_exact- (N, horizon+1) years since the exact start year (differs from t for fractional starts)
+      base   - (N,) value at start_year, interpolated between observed years
+      delta  - (N, horizon+1) change in index points vs base (NaN where the year is unobserved)
+      pct    - (N, horizon+1) % change vs base
+    Unknown entities give all-NaN rows. Fractional start years are interpolated for the
+    baseline; the window starts at the first whole year >= start_year.
+    """
+    names = [e for e, _ in events]
+    starts = np.array([s for _, s in events], dtype=float)
+    idx = np.array([panel.entity_index.get(e, -1) for e in names])
+    known = idx >= 0
+
+    rows = np.full((len(events), len(panel.years)), np.nan)
+    rows[known] = panel.values[idx[known]]
+    filled = fill_gaps(rows)
+
+    # baseline: interpolate the gap-filled rows at the (possibly fractional) start year
+    pos = np.clip(starts - panel.year0, 0, len(panel.years) - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, len(panel.years) - 1)
+    r = np.arange(len(events))
+    base = filled[r, lo] + (pos - lo) * (filled[r, hi] - filled[r, lo])
+
+    # window of observed values at t = 0..horizon
+    t = np.arange(horizon + 1)
+    cols = np.ceil(starts - panel.year0).astype(int)[:, None] + t[None, :]
+    inside = (cols >= 0) & (cols < len(panel.years))
+    window = np.where(inside, rows[r[:, None], np.clip(cols, 0, len(panel.years) - 1)], np.nan)
+    offset = (np.ceil(starts) - starts)[:, None]  # t is measured from the exact start year
+    window[t[None, :] + offset > horizon] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = window - base[:, None]
+        pct = (window / base[:, None] - 1.0) * 100.0
+    return {"t": t, "t_exact": t + offset, "base": base, "delta": delta, "pct": pct, "events": list(events)}
+
+
+def event_bands(matrix, quantiles=(0.1, 0.5, 0.9)):
+    # cross-event mean, quantile bands and event count at every t (ignoring missing years)
+    matrix = np.asarray(matrix, dtype=float)
+    counts = np.sum(~np.isnan(matrix), axis=0)
+    with np.errstate(invalid="ignore"):
+        mean = np.where(counts > 0, np.nansum(matrix, axis=0) / np.maximum(counts, 1), np.nan)
+    bands = np.full((len(quantiles), matrix.shape[1]), np.nan)
+    ok = counts > 0
+    if ok.any():
+        bands[:, ok] = np.nanquantile(matrix[:, ok], quantiles, axis=0)
+    return {"mean": mean, "quantiles": dict(zip(quantiles, bands)), "count": counts}
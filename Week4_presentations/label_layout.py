@@ -0,0 +1,94 @@
+# Collision-free placement of rotated event labels: sort by x, sweep over a grid of y slots
+from collections import deque
+
+import numpy as np
+
+
+def layout_labels(xs, heights, width, base=0.5, lo=0.0, hi=1.0, avoid=None, clearance=0.0, n_slots=64):
+    """
+    Vertical positions (label centres, in axes fraction) for N vertical labels.
+
+    xs       - label x positions (data units); labels closer than `width` share a column
+    heights  - label lengths in axes fraction (how much of the y-axis each rotated label covers)
+    base     - preferred centre; lo/hi bound the band labels may use
+    avoid    - optional y (axes fraction) per label to keep clear of, e.g. the data line at that x,
+               with `clearance` extra space around it
+
+    Labels are swept in x order. The labels still within `width` of the current x sit in a
+    deque (x-sorted, so expiry is from the left) and mark the y slots they cover in an
+    occupancy array; for each new label every candidate start slot is scored at once from a
+    cumulative sum of that array. Cost order: overlap with neighbours, then covering the
+    avoided y, then distance from `base`. Sorting is O(N log N) and each label costs
+    O(n_slots), so hundreds of labels stay cheap; when a column is too crowded the least
+    overlapping slot is used rather than failing.
+    """
+    xs = np.asarray(xs, dtype=float)
+    n = len(xs)
+    heights = np.broadcast_to(np.asarray(heights, dtype=float), (n,))
+    avoid = None if avoid is None else np.broadcast_to(np.asarray(avoid, dtype=float), (n,))
+    ys = np.full(n, (lo + hi) / 2)
+    if n == 0:
+        return ys
+
+    cell = (hi - lo) / n_slots
+    occ = np.zeros(n_slots, dtype=int)
+    active = deque()  # (x, first slot, n slots) of placed labels still in the sweep window
+    for i in np.argsort(xs, kind="stable"):
+        while active and active[0][0] <= xs[i] - width:
+            _, s, k = active.popleft()
+            occ[s:s + k] -= 1
+
+        k = min(max(int(np.ceil(heights[i] / cell)), 1), n_slots)
+        starts = np.arange(n_slots - k + 1)
+        csum = np.concatenate(([0], np.cumsum(occ)))
+        overlap = csum[starts + k] - csum[starts]
+        bottom = lo + starts * cell
+        centre = bottom + k * cell / 2
+        cost = np.abs(centre - base)
+        if avoid is not None and not np.isnan(avoid[i]):
+            covers = (bottom - clearance < avoid[i]) & (avoid[i] < bottom + k * cell + clearance)
+            cost = cost + 2.0 * covers  # any clear slot beats the nearest covering one
+        cost = cost + 10.0 * overlap
+
+        s = int(starts[np.argmin(cost)])
+        occ[s:s + k] += 1
+        active.append((xs[i], s, k))
+        ys[i] = lo + (s + k / 2) * cell
+    return ys
+
+
+def text_extent(ax, labels, fontsize):
+    """
+    Approximate size of vertical (rotation=90) labels without a draw: returns the column width
+    in x data units and each label's length as a fraction of the axes height.
+    """
+    dpi = ax.figure.dpi
+    box = ax.get_window_extent()
+    x0, x1 = ax.get_xlim()
+    width = 1.2 * fontsize * dpi / 72 * abs(x1 - x0) / box.width
+    heights = np.array([0.55 * len(label) * fontsize * dpi / 72 / box.height for label in labels])
+    return width, heights
+
+
+def annotate_events(ax, xs, labels, xoff=0.35, base=0.5, lo=0.05, hi=0.95, y_line=None, clearance=0.0,
+                    fontsize=10, colors="grey", **text_kw):
+    """
+    Draw rotated event labels next to their marker lines without overlaps.
+    y_line (data units, one per label) keeps labels off the plotted series; colors may be one
+    colour or one per label. Returns the label centres in data units.
+    """
+    xs = np.asarray(xs, dtype=float)
+    xoff = np.broadcast_to(np.asarray(xoff, dtype=float), xs.shape)
+    colors = [colors] * len(xs) if isinstance(colors, str) else list(colors)
+    width, heights = text_extent(ax, labels, fontsize)
+
+    y0, y1 = ax.get_ylim()
+    avoid = None
+    if y_line is not None:
+        avoid = (np.asarray(y_line, dtype=float) - y0) / (y1 - y0)  # works for inverted axes too
+    frac = layout_labels(xs + xoff, heights, width, base, lo, hi, avoid, clearance)
+    ys = y0 + frac * (y1 - y0)
+    for x, dx, y, label, color in zip(xs, xoff, ys, labels, colors):
+        ax.text(x + dx, y, label, rotation=90, va="center", ha="center", color=color, fontsize=fontsize,
+                **text_kw)
+    return ys
@@ -0,0 +1,129 @@
+# Cross-indicator correlations and lagged cross-correlations for every entity at once
+#
+#   python lead_lag.py --csv key-features-of-liberal-democracy.csv --out lead_lag.npz
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from rol_panel import load_panel, short_label
+
+
+def lagged_correlations(data, max_lag=10, min_obs=10):
+    """
+    data: (indicators K, entities E, years Y) with NaN for missing years.
+
+    Returns (r, n), both shaped (E, K, K, 2*max_lag+1): r[e, a, b, max_lag + L] is the correlation
+    of indicator a in year t with indicator b in year t+L for entity e, over the years where both
+    are observed (pairwise-complete), and n the number of such years. Positive L means a leads b.
+    Cells with fewer than min_obs years or a constant series are NaN.
+
+    Missing years are masked rather than dropped: values are zero-filled and every sum is taken
+    against the joint mask, so for each lag all entities and indicator pairs come out of a few
+    einsums over the whole array.
+    """
+    masked = np.ma.masked_invalid(np.asarray(data, dtype=float))
+    x = masked.filled(0.0)
+    m = (~np.ma.getmaskarray(masked)).astype(float)
+    n_ind, n_ent, n_years = x.shape
+    lags = np.arange(-max_lag, max_lag + 1)
+    r = np.full((n_ent, n_ind, n_ind, len(lags)), np.nan, dtype=np.float32)
+    n = np.zeros((n_ent, n_ind, n_ind, len(lags)), dtype=np.int16)
+
+    for k, lag in enumerate(lags):
+        if abs(lag) >= n_years:
+            continue
+        # a at t, b at t + lag
+        lead = slice(0, n_years - lag) if lag >= 0 else slice(-lag, n_years)
+        follow = slice(lag, n_years) if lag >= 0 else slice(0, n_years + lag)
+        xa, ma = x[:, :, lead], m[:, :, lead]
+        xb, mb = x[:, :, follow], m[:, :, follow]
+
+        cnt = np.einsum("aey,bey->eab", ma, mb)
+        sa = np.einsum("aey,bey->eab", xa, mb)        # sum of a where b is also observed
+        sb = np.einsum("aey,bey->eab", ma, xb)
+        saa = np.einsum("aey,bey->eab", xa * xa, mb)
+        sbb = np.einsum("aey,bey->eab", ma, xb * xb)
+        sab = np.einsum("aey,bey->eab", xa, xb)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = cnt * sab - sa * sb
+            var = (cnt * saa - sa * sa) * (cnt * sbb - sb * sb)
+            rho = cov / np.sqrt(var)
+        ok = (cnt >= min_obs) & (var > 1e-12 * np.maximum(cnt, 1) ** 4)
+        r[..., k] = np.where(ok, np.clip(rho, -1.0, 1.0), np.nan)
+        n[..., k] = cnt
+    return r, n
+
+
+def pooled(r, n):
+    """
+    Cross-entity summary (K, K, lags): the Fisher-z mean of the per-entity correlations,
+    weighted by n - 3 (entities with more overlapping years count more).
+    """
+    z = np.arctanh(np.clip(r.astype(float), -0.999999, 0.999999))
+    w = np.where(np.isnan(z), 0.0, np.maximum(n.astype(float) - 3, 0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_z = np.nansum(z * w, axis=0) / w.sum(axis=0)
+    return np.tanh(mean_z)
+
+
+def lead_lag_table(r, n, indicators, target, max_lag=10):
+    """
+    For every other indicator: pooled correlation with `target` at lag 0 and the lag with the
+    strongest pooled correlation (positive = the other indicator leads the target).
+    """
+    t = [k for k, ind in enumerate(indicators) if target.lower() in ind.lower()]
+    if len(t) != 1:
+        raise KeyError(f"Indicator {target!r} matches {len(t)} columns: {indicators}")
+    t = t[0]
+    rp = pooled(r, n)
+    lags = np.arange(-max_lag, max_lag + 1)
+    rows = []
+    for k, ind in enumerate(indicators):
+        if k == t:
+            continue
+        curve = rp[k, t]
+        best = int(np.nanargmax(np.abs(curve))) if np.any(~np.isnan(curve)) else max_lag
+        rows.append({
+            "indicator": short_label(ind),
+            "r_lag0": curve[max_lag],
+            "best_lag": int(lags[best]),
+            "r_best": curve[best],
+            "entities": int(np.sum(~np.isnan(r[:, k, t, max_lag]))),
+        })
+    return pd.DataFrame(rows)
+
+
+def save_table(path, r, n, entities, indicators, max_lag):
+    # compact binary table: float32 correlations, int16 counts, names alongside
+    np.savez_compressed(path, r=r, n=n, entities=np.array(entities), indicators=np.array(indicators),
+                        lags=np.arange(-max_lag, max_lag + 1))
+
+
+def load_table(path):
+    with np.load(path) as f:
+        return {k: f[k] for k in f.files}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Correlations and lead/lag between democracy indicators.")
+    ap.add_argument("--csv", default="key-features-of-liberal-democracy.csv")
+    ap.add_argument("--out", default="lead_lag.npz", help="Binary output table")
+    ap.add_argument("--target", default="Rule of Law", help="Indicator to summarise leads/lags against")
+    ap.add_argument("--max-lag", type=int, default=10)
+    ap.add_argument("--min-obs", type=int, default=10, help="Fewest overlapping years for a correlation")
+    ap.add_argument("--changes", action="store_true",
+                    help="Correlate year-on-year changes instead of levels (levels are dominated by persistence)")
+    args = ap.parse_args()
+
+    panel = load_panel(args.csv)
+    data = np.diff(panel.data.astype(float), axis=2) if args.changes else panel.data
+    r, n = lagged_correlations(data, args.max_lag, args.min_obs)
+    save_table(args.out, r, n, panel.entities, panel.indicators, args.max_lag)
+    print(f"Saved {r.shape[0]} entities x {r.shape[1]}x{r.shape[2]} indicator pairs x {r.shape[3]} lags to {args.out}")
+    print(lead_lag_table(r, n, panel.indicators, args.target, args.max_lag).to_string(index=False,
+                                                                                      float_format="%.3f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Entity lineages: one continuous series per state, filled from its predecessors / parts where it has no data
+import numpy as np
+
+from event_study import fill_gaps
+
+# successor -> [(predecessor or part, first year, last year)], None = open-ended.
+# Names missing from the data are skipped, so both "Russia" and "Soviet Union" style datasets work.
+LINEAGES = {
+    "Germany": [("West Germany", 1949, 1990), ("East Germany", 1949, 1990)],
+    "Russia": [("Soviet Union", None, 1991), ("USSR", None, 1991)],
+    "Serbia": [("Yugoslavia", None, 2003), ("Serbia and Montenegro", 2003, 2006)],
+    "Czechia": [("Czechoslovakia", None, 1992)],
+    "Vietnam": [("Democratic Republic of Vietnam", 1945, 1975)],
+    "Yemen": [("Yemen Arab Republic", None, 1990), ("Yemen People's Republic", None, 1990)],
+}
+
+
+def _spec_key(lineages):
+    return tuple(sorted((k, tuple(tuple(m) for m in v)) for k, v in lineages.items()))
+
+
+def _fill_interior(rows):
+    # interpolate gaps between observations, leave years before the first / after the last NaN
+    observed = ~np.isnan(rows)
+    filled = fill_gaps(rows)
+    inside = np.maximum.accumulate(observed, axis=1) & np.maximum.accumulate(observed[:, ::-1], axis=1)[:, ::-1]
+    filled[~inside] = np.nan
+    return filled
+
+
+def lineage_rows(panel, entity, lineages=LINEAGES):
+    # panel rows a stitched series for entity reads: its own row plus any predecessors present
+    names = [entity] + [name for name, _, _ in lineages.get(entity, [])]
+    return [panel.entity_index[n] for n in names if n in panel.entity_index]
+
+
+def stitch_all(panel, lineages=LINEAGES):
+    """
+    Continuous series for every lineage of the active indicator, in one pass.
+
+    A successor keeps its own value wherever it is observed; other years take the mean of its
+    predecessors observed in their year span (e.g. West/East Germany 1949-1990). Interior gaps
+    are then interpolated linearly for all lineages at once, while years before the first or
+    after the last observation stay NaN. Cached on the panel per indicator and lineage table.
+
+    Returns {"entities": [...], "index": {name: row}, "values": (L, Y), "observed": (L, Y) bool}.
+    """
+    key = ("lineage", panel.active, _spec_key(lineages))
+    if key in panel.cache:
+        return panel.cache[key]
+
+    names = [s for s in lineages if lineage_rows(panel, s, lineages)]
+    n_years = len(panel.years)
+    own = np.full((len(names), n_years), np.nan)
+    lin_idx, rows, lo, hi = [], [], [], []
+    for i, name in enumerate(names):
+        if name in panel.entity_index:
+            own[i] = panel.values[panel.entity_index[name]]
+        for pred, start, end in lineages[name]:
+            if pred in panel.entity_index:
+                sl = panel.cols(panel.years[0] if start is None else start, panel.years[-1] if end is None else end)
+                lin_idx.append(i); rows.append(panel.entity_index[pred]); lo.append(sl.start); hi.append(sl.stop)
+
+    # predecessors: mask every (lineage, predecessor) row outside its span, then pool per lineage
+    sums = np.zeros_like(own)
+    counts = np.zeros_like(own)
+    if rows:
+        cols = np.arange(n_years)
+        in_span = (cols >= np.array(lo)[:, None]) & (cols < np.array(hi)[:, None])
+        vals = np.where(in_span, panel.values[rows].astype(float), np.nan)
+        seen = ~np.isnan(vals)
+        np.add.at(sums, np.array(lin_idx), np.where(seen, vals, 0.0))
+        np.add.at(counts, np.array(lin_idx), seen)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pooled = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    merged = np.where(np.isnan(own), pooled, own)
+
+    result = {"entities": names, "index": {n: i for i, n in enumerate(names)},
+              "values": _fill_interior(merged), "observed": ~np.isnan(merged)}
+    panel.cache[key] = result
+    return result
+
+
+def stitched_row(panel, entity, lineages=LINEAGES):
+    # full-length continuous row for one entity (its own row, gap-filled, when it has no lineage)
+    table = stitch_all(panel, lineages)
+    if entity in table["index"]:
+        return table["values"][table["index"][entity]]
+    return _fill_interior(panel.row(entity).astype(float)[None])[0]
@@ -0,0 +1,93 @@
+# Period-window aggregation: means, medians, counts and deltas for any list of (entity, label, start, end)
+import numpy as np
+import pandas as pd
+
+
+def cumulative(panel):
+    """
+    Per-entity running sums and observation counts along year for the active indicator,
+    with a leading zero column so the sum over columns [lo, hi) is csum[:, hi] - csum[:, lo].
+    Cached on the panel per indicator (select() views share the cache; the data is read-only).
+    """
+    key = ("cumulative", panel.active)
+    if key not in panel.cache:
+        vals = panel.values.astype(float)
+        seen = ~np.isnan(vals)
+        zero = np.zeros((vals.shape[0], 1))
+        csum = np.hstack([zero, np.cumsum(np.where(seen, vals, 0.0), axis=1)])
+        ccount = np.hstack([zero, np.cumsum(seen, axis=1)])
+        panel.cache[key] = (csum, ccount)
+    return panel.cache[key]
+
+
+def _rows(panel, entity):
+    # one entity name/code, or a list of names/row indices pooled together (e.g. East/West Germany)
+    if isinstance(entity, str):
+        i = panel.entity_index.get(entity, panel.code_index.get(entity))
+        return [] if i is None else [i]
+    return [panel.entity_index[e] if isinstance(e, str) else int(e) for e in entity]
+
+
+def window_stats(panel, windows):
+    """
+    windows: list of (entity, label, start, end) with inclusive years; entity is a name or a list
+    of names/row indices to pool. Returns one row per window with columns
+      entity, label, start, end, mean, median, count, delta
+    where delta is the window mean minus the mean of that entity's first listed window
+    (so [pre, war] gives war - pre). Means and counts come from the cumulative sums, i.e. O(1)
+    per window and row; medians from one padded block. Windows with no data give NaN / 0.
+    """
+    csum, ccount = cumulative(panel)
+    n_years = len(panel.years)
+
+    # flatten to (window, row) pairs so pooled windows are just several pairs
+    win_id, row_id, lo, hi = [], [], [], []
+    for w, (entity, _, start, end) in enumerate(windows):
+        sl = panel.cols(start, end)
+        for r in _rows(panel, entity):
+            win_id.append(w); row_id.append(r); lo.append(sl.start); hi.append(sl.stop)
+    win_id, row_id = np.array(win_id, dtype=int), np.array(row_id, dtype=int)
+    lo, hi = np.array(lo, dtype=int), np.array(hi, dtype=int)
+
+    n_win = len(windows)
+    sums = np.bincount(win_id, csum[row_id, hi] - csum[row_id, lo], minlength=n_win)
+    counts = np.bincount(win_id, ccount[row_id, hi] - ccount[row_id, lo], minlength=n_win).astype(int)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    # medians: gather every pair's window into a padded (window, pooled row x year) block
+    medians = np.full(n_win, np.nan)
+    if len(win_id):
+        width = int((hi - lo).max()) if len(hi) else 0
+        slot = np.zeros(len(win_id), dtype=int)  # position of each pair within its window
+        order = np.argsort(win_id, kind="stable")
+        begins = np.searchsorted(win_id[order], win_id[order])
+        slot[order] = np.arange(len(order)) - begins
+        per_win = int(slot.max()) + 1
+        offs = np.arange(max(width, 1))
+        cols = lo[:, None] + offs[None, :]
+        ok = cols < hi[:, None]
+        vals = np.where(ok, panel.values[row_id[:, None], np.clip(cols, 0, n_years - 1)], np.nan)
+        block = np.full((n_win, per_win, vals.shape[1]), np.nan)
+        block[win_id, slot] = vals
+        block = block.reshape(n_win, -1)
+        has = counts > 0
+        if has.any():
+            medians[has] = np.nanmedian(block[has], axis=1)
+
+    names = [e if isinstance(e, str) else "+".join(panel.entities[i] for i in _rows(panel, e))
+             for e, _, _, _ in windows]
+    out = pd.DataFrame({
+        "entity": names,
+        "label": [w[1] for w in windows],
+        "start": [w[2] for w in windows],
+        "end": [w[3] for w in windows],
+        "mean": means,
+        "median": medians,
+        "count": counts,
+    })
+    codes, _ = pd.factorize(out["entity"])
+    first = np.full(codes.max() + 1 if len(codes) else 0, -1)
+    first[codes[::-1]] = np.arange(len(codes))[::-1]  # earliest window of every entity
+    out["delta"] = means - means[first[codes]]
+    return out
@@ -6,20 +6,22 @@ import matplotlib.pyplot as plt
 from matplotlib.ticker import MultipleLocator, MaxNLocator, FuncFormatter
 from matplotlib.lines import Line2D
 from matplotlib.patches import Patch
+from rol_panel import load_panel
+from event_study import event_matrix, event_bands
+from label_layout import annotate_events
+from period_windows import window_stats
+from lineage import lineage_rows, stitched_row
+from build_manifest import MANIFEST_NAME, BuildManifest, code_version, entity_rows, figure_key, slice_hash
 
 #helpers
-def load_data(csv_path):
-    df = pd.read_csv(csv_path)
-    col_entity = "Entity"
-    col_year = "Year"
-    rol_cols = [c for c in df.columns if "Rule of Law index" in c]
-    if not rol_cols:
-        raise ValueError("Could not find 'Rule of Law index' column")
-    col_rol = rol_cols[0]
-    df = df[[col_entity, col_year, col_rol]].dropna(subset=[col_entity, col_year, col_rol])
-    df[col_year] = df[col_year].astype(int)
-    df[col_rol] = df[col_rol].astype(float)
-    return df, col_entity, col_year, col_rol
+def load_data(csv_path, indicator="Rule of Law index"):
+    #read every indicator once into a dense indicator x entity x year array,
+    #then make the requested one active (figures can still switch with indicator=...)
+    panel = load_panel(csv_path)
+    try:
+        return panel.select(indicator)
+    except KeyError:
+        raise ValueError(f"Could not find '{indicator}' column")
 
 def set_matplotlib_defaults():
     plt.rcParams.update({
@@ -32,65 +34,69 @@ def set_matplotlib_defaults():
         "ytick.labelsize": 8,
     })
 
-#build a continuous Germany series by combining East/West when needed and interpolating gaps.
-def germany_continuous(df, col_entity, col_year, col_rol, start=1930, end=1950):
+#build a continuous series from the entity's lineage (e.g. West/East Germany 1949-1990, see lineage.py) and interpolate gaps.
+def continuous_series(panel, country, start, end):
     years = np.arange(start, end + 1)
-    vals = []
-    for y in years:
-        subset = df[(df[col_year] == y) & (df[col_entity].str.contains("Germany"))]
-        exact = subset[subset[col_entity] == "Germany"]
-        if not exact.empty:
-            vals.append(float(exact[col_rol].mean()))
-        else:
-            vals.append(float(subset[col_rol].mean()) if not subset.empty else np.nan)
-    series = pd.DataFrame({col_year: years, col_rol: vals})
-    series[col_rol] = series[col_rol].interpolate(method="linear", limit_direction="both")
-    return series
-
-def value_at(df_country, col_year, col_rol, year):
-    yrs = df_country[col_year].values.astype(float)
-    vals = df_country[col_rol].values.astype(float)
-    return float(np.interp(year, yrs, vals))
-
-#Δ vs t0 window for regime-start charts
-def delta_since_start(df, col_entity, col_year, col_rol, country, start_year, horizon=12):
-    s = df[df[col_entity] == country].sort_values(col_year)
-    if s.empty:
+    return years, panel.interpolated(stitched_row(panel, country)[panel.cols(start, end)])
+
+def germany_continuous(panel, start=1930, end=1950):
+    return continuous_series(panel, "Germany", start, end)
+
+def value_at(panel, country, year):
+    return panel.value_at(country, year)
+
+#pre-war and war period means for Figures 4/4a (Germany pools its lineage, i.e. East/West), all in one pass
+def pre_vs_war_means(panel):
+    germany = lineage_rows(panel, "Germany")
+    stats = window_stats(panel, [(germany, "pre", 1930, 1932), (germany, "war", 1939, 1945),
+                                 ("Russia", "pre", 2010, 2018), ("Russia", "war", 2022, 2024)])
+    return stats["mean"].tolist()
+
+#Δ vs t0 window for regime-start charts (one event; see event_study.event_matrix for many at once)
+def _single_event(panel, country, start_year, horizon, column):
+    m = event_matrix(panel, [(country, start_year)], horizon)
+    t, v = m["t_exact"][0], m[column][0]
+    keep = ~np.isnan(v)
+    return pd.DataFrame({"t": t[keep], column: v[keep]})
+
+def delta_since_start(panel, country, start_year, horizon=12):
+    if country not in panel.entity_index:
         return pd.DataFrame({})
-    base = value_at(s, col_year, col_rol, start_year)
-    w = s[(s[col_year] >= start_year) & (s[col_year] <= start_year + horizon)].copy()
-    w["t"] = w[col_year] - start_year
-    w["delta_pts"] = w[col_rol] - base
-    return w[["t", "delta_pts"]]
+    return _single_event(panel, country, start_year, horizon, "delta").rename(columns={"delta": "delta_pts"})
 
 
 #figure generators
 
 #FIGURE 1: Germany with event markers and shaded areas
-def fig1_germany(df, col_entity, col_year, col_rol, outpath):
-    ger_c = germany_continuous(df, col_entity, col_year, col_rol, 1930, 1950)
+def fig1_germany(panel, outpath, indicator=None):
+    panel = panel.select(indicator) if indicator else panel
+    ger_years, ger_vals = germany_continuous(panel, 1930, 1950)
     fig, ax = plt.subplots(figsize=(9, 5))
-    ax.plot(ger_c[col_year], ger_c[col_rol], linewidth=1.6, color="red")
-    ax.set_title("Germany — Rule of Law (1930–1950)")
+    ax.plot(ger_years, ger_vals, linewidth=1.6, color="red")
+    ax.set_title(f"Germany — {panel.label} (1930–1950)")
     ax.set_xlabel("Year")
-    ax.set_ylabel("Rule of Law Index")
+    ax.set_ylabel(f"{panel.label} Index")
 
     #shadings
     ax.axvspan(1932, 1938, alpha=0.05, color="red", label="Rise of Nazi Germany")  # rise of Nazi Germany
     ax.axvspan(1939, 1945, alpha=0.20, color="grey", label="World War II")  # WWII
 
     #marker labels mid-height with slight x-offset to avoid dashed lines
-    y_min, y_max = float(np.nanmin(ger_c[col_rol])), float(np.nanmax(ger_c[col_rol]))
+    y_min, y_max = float(np.nanmin(ger_vals)), float(np.nanmax(ger_vals))
     y_mid = y_min + 0.5*(y_max - y_min)
-    for x, label in [(1932, "Nazi Germany rise (1932)"),
-                     (1933, "Hitler becomes Chancellor (1933)"),
-                     (1935, "Nuremberg Laws (1935)"),
-                     (1939, "WWII starts (1939)"),
-                     (1943, "Weakening of Nazi Germany begins (1943)"),
-                     (1945, "WWII ends (1945)") ]:
+    markers = [(1932, "Nazi Germany rise (1932)"),
+               (1933, "Hitler becomes Chancellor (1933)"),
+               (1935, "Nuremberg Laws (1935)"),
+               (1939, "WWII starts (1939)"),
+               (1943, "Weakening of Nazi Germany begins (1943)"),
+               (1945, "WWII ends (1945)")]
+    for x, _ in markers:
         ax.axvline(x, linestyle="--", linewidth=0.8, color="grey")
-        txt_colour = "black" if x in (1933, 1945) else "grey" #highlight key events
-        ax.text(x + 0.35, y_mid, label, rotation=90, va="center", ha="center", color=txt_colour, fontsize=10)
+    ax.set_xlim(1930, 1950)  #label widths are measured against the final x range
+    y0, y1 = ax.get_ylim()
+    annotate_events(ax, [x for x, _ in markers], [label for _, label in markers], xoff=0.35,
+                    base=(y_mid - y0) / (y1 - y0),
+                    colors=["black" if x in (1933, 1945) else "grey" for x, _ in markers])  #highlight key events
 
     #label legend
     ax.legend(loc="upper right", fontsize=7.5)
@@ -106,15 +112,15 @@ def fig1_germany(df, col_entity, col_year, col_rol, outpath):
 
 
 #FIGURE 2: Russia with event markers
-def fig2_russia(df, col_entity, col_year, col_rol, outpath):
-    full_rus = df[df[col_entity] == "Russia"].sort_values(col_year)
-    rus = full_rus[(full_rus[col_year].between(1999, 2024))]  # include 1999
+def fig2_russia(panel, outpath, indicator=None):
+    panel = panel.select(indicator) if indicator else panel
+    rus_years, rus_vals = panel.series("Russia", 1999, 2024)  # include 1999
 
     fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(rus[col_year], rus[col_rol], linewidth=1.6, color="black")
-    ax.set_title("Russia — Rule of Law (1999–2024)")
+    ax.plot(rus_years, rus_vals, linewidth=1.6, color="black")
+    ax.set_title(f"Russia — {panel.label} (1999–2024)")
     ax.set_xlabel("Year")
-    ax.set_ylabel("Rule of Law Index")
+    ax.set_ylabel(f"{panel.label} Index")
 
     #shadings
     ax.axvspan(1999, 2000, alpha=0.03, color="red", label="Putin's Rise")  #Putin's Rise
@@ -123,64 +129,15 @@ def fig2_russia(df, col_entity, col_year, col_rol, outpath):
     ax.axvspan(2022, 2024, alpha=0.20, color="grey", label="Ukraine Invasion")  # Ukraine Invasion
 
     #clamp y-lims to data with small pad
-    y_min = float(rus[col_rol].min())
-    y_max = float(rus[col_rol].max())
+    y_min = float(rus_vals.min())
+    y_max = float(rus_vals.max())
     pad = 0.04 * (y_max - y_min if y_max > y_min else 0.01)
     ax.set_ylim(y_min - pad, y_max + pad)
 
     def y_at(year):
-        return value_at(full_rus, col_year, col_rol, year)
-    
-    def place_label(ax, x, y_line, placed, y_low, y_high,
-                    base_pos=0.6, 
-                    min_gap_y=0.06,
-                    min_gap_lbl=0.08,
-                    search_steps=12):
-        #find position for label that does not overlap with existing ones
-        y0, y1 = ax.get_ylim()
-        yr = y1 - y0
-
-        y_cand = y0 + base_pos * yr
-        y_cand = max(min(y_cand, y_high - 0.01*yr), y_low + 0.01*yr)
-    
-        #initial candiate y around base_pos of axis, clamp to y_low/y_high
-        y_range = ax.get_ylim()[1] - ax.get_ylim()[0]
-        y_base = ax.get_ylim()[0] + 0.55 * y_range
-
-        #if too close to data line, move away
-        if abs(y_cand - y_line) < min_gap_y * yr:
-            if y_line <= y_cand:
-                y_cand = min(y_high - 0.01*yr, y_line + min_gap_y * yr)
-            else:
-                y_cand = max(y_low + 0.01*yr, y_line - min_gap_y * yr)
-        
-        #if still too close to existing labels, try to move up/down in steps
-        near = [(xx, yy) for xx, yy in placed if abs(xx - x) <= 1.0]
-        step = (min_gap_lbl * yr)
-        direction = 1
-        for _ in range(search_steps):
-            ok = True
-            for _, yy in near:
-                if abs(y_cand - yy) < min_gap_lbl * yr:
-                    ok = False
-                    break
-                if ok:
-                    return y_cand
-                #not ok, move
-                y_cand = y_cand + direction * step
-                #flip direction if hit bounds
-                direction *= -1
-                step *= 0.9
-                y_cand = max(min(y_cand, y_high - 0.01*yr), y_low + 0.01*yr)
-        
-        return y_cand  #give up, return last candidate
-    
-    #marker labels with collision avoidace
-    y0, y1 = ax.get_ylim()
-    yrange = y1 - y0
-    y_low = y0 + 0.1 * yrange
-    y_high = y1 - 0.06 * yrange
-    
+        return panel.value_at("Russia", year)
+
+    #marker labels with collision avoidance (kept off the data line and away from each other)
     markers = [
         (1999, "Putin to Prime Minister (1999)"),
         (2001.5, "Putin economic reforms (2001-2003)"),
@@ -192,23 +149,16 @@ def fig2_russia(df, col_entity, col_year, col_rol, outpath):
         (2022, "Full-scale invasion of Ukraine (2022)"),
         (2024, "Putin fifth term (2024)"),
     ]
-    
-    placed = []
-    for i, (x, label) in enumerate(markers):
+    xs = [x for x, _ in markers]
+    for x in xs:
         ax.axvline(x, linestyle="--", linewidth=0.8, color="grey")
 
-        #small x offset to avoid dashed line
-        xoff = 0.35 if i % 2 == 0 else 0.45
-
-        y_line = y_at(x)
-        y_lab = place_label(ax, x, y_line, placed, y_low, y_high,
-                            base_pos=0.58, min_gap_y=0.06, min_gap_lbl=0.08)
-        placed.append((x, y_lab))
-
-
-        ax.text(x + xoff, y_lab, label, 
-                rotation=90, va="center", ha="center", 
-                color="grey", fontsize=10, clip_on=True)
+    #small x offset to avoid dashed line
+    ax.set_xlim(1999, 2024)  #label widths are measured against the final x range
+    annotate_events(ax, xs, [label for _, label in markers],
+                    xoff=[0.35 if i % 2 == 0 else 0.45 for i in range(len(markers))],
+                    base=0.58, lo=0.1, hi=0.94, y_line=[y_at(x) for x in xs], clearance=0.02,
+                    clip_on=True)
 
     #label legend
     ax.legend(loc="upper right", fontsize=7.5)
@@ -223,22 +173,10 @@ def fig2_russia(df, col_entity, col_year, col_rol, outpath):
 
 
 #FIGURE 3: Δ vs t0 with top baseline
-def fig3_since_regime_topbaseline(df, col_entity, col_year, col_rol, outpath):
-    
-    def delta_since_start(country, start_year, horizon=12):
-        s = df[df[col_entity] == country].sort_values(col_year)
-        if s.empty:
-            return None
-        yrs = s[col_year].values.astype(float)
-        vals = s[col_rol].values.astype(float)
-        base = float(np.interp(start_year, yrs, vals))
-        w = s[(s[col_year] >= start_year) & (s[col_year] <= start_year + horizon)].copy()
-        w["t"] = w[col_year] - start_year
-        w["delta_pts"] = w[col_rol] - base
-        return w[["t", "delta_pts"]]
-    
-    g_reg = delta_since_start("Germany", 1933, horizon=12)
-    r_reg = delta_since_start("Russia", 1999, horizon=12)
+def fig3_since_regime_topbaseline(panel, outpath, indicator=None):
+    panel = panel.select(indicator) if indicator else panel
+    g_reg = delta_since_start(panel, "Germany", 1933, horizon=12)
+    r_reg = delta_since_start(panel, "Russia", 1999, horizon=12)
 
     fig, axL = plt.subplots(figsize=(10, 6))
     axR = axL.twinx() #right y-axis shares x but has own y-axis
@@ -271,7 +209,7 @@ def fig3_since_regime_topbaseline(df, col_entity, col_year, col_rol, outpath):
     baseline_proxy = Line2D([0], [0], color="grey", linewidth=1.8)
 
     #legend
-    axL.set_title("Change in Rule of Law — Years Since Regime Start")
+    axL.set_title(f"Change in {panel.label} — Years Since Regime Start")
     axL.set_xlabel("Years since start (t)")
     axL.set_ylabel("Δ (Germany index points)", color="red")
     axR.set_ylabel("Δ (Russia index points)", color="black")
@@ -309,26 +247,18 @@ def fig3_since_regime_topbaseline(df, col_entity, col_year, col_rol, outpath):
 #FIGURE 3 (ALT): dual y-axes with % change from t0 (0 at top, only negatives)
 #shows data in a easier to interpret % change format, but dual axes can be hard to read
 
-def _pct_since_start(df, col_entity, col_year, col_rol, country, start_year, horizon=12):
-    s = df[df[col_entity] == country].sort_values(col_year)
-    if s.empty:
+def _pct_since_start(panel, country, start_year, horizon=12):
+    if country not in panel.entity_index:
         return None, start_year
-    
-    yrs = s[col_year].values.astype(float)
-    vals = s[col_rol].values.astype(float)
-    base = float(np.interp(start_year, yrs, vals))
-
-    w = s[(s[col_year] >= start_year) & (s[col_year] <= start_year + horizon)].copy()
-    w["t"] = w[col_year] - start_year
     # % change vs t0
-    w["delta_pct"] = (w[col_rol] / base - 1.0) * 100.0
-    return w[["t", "delta_pct"]], start_year
+    return _single_event(panel, country, start_year, horizon, "pct").rename(columns={"pct": "delta_pct"}), start_year
 
 
-def fig3a_since_regime_dual_axes_pct(df, col_entity, col_year, col_rol, outpath, g_start=1933, r_start=1999):
+def fig3a_since_regime_dual_axes_pct(panel, outpath, g_start=1933, r_start=1999, indicator=None):
+    panel = panel.select(indicator) if indicator else panel
 
-    g, _ = _pct_since_start(df, col_entity, col_year, col_rol, "Germany", g_start, horizon=12)
-    r, _ = _pct_since_start(df, col_entity, col_year, col_rol, "Russia", r_start, horizon=12)
+    g, _ = _pct_since_start(panel, "Germany", g_start, horizon=12)
+    r, _ = _pct_since_start(panel, "Russia", r_start, horizon=12)
 
     fig, axL = plt.subplots(figsize=(10, 6))
     axR = axL.twinx()  #right axis for Russia
@@ -368,19 +298,12 @@ def fig3a_since_regime_dual_axes_pct(df, col_entity, col_year, col_rol, outpath,
     pct_fmt = FuncFormatter(lambda v, pos: f"{v:.0f}%")
     axL.yaxis.set_major_formatter(pct_fmt)
     axR.yaxis.set_major_formatter(pct_fmt)
-    axL.set_title("% Change in Rule of Law — Years Since Regime Start")
+    axL.set_title(f"% Change in {panel.label} — Years Since Regime Start")
     axL.set_xlabel("Years since start (t)")
     axL.set_ylabel("Δ % — Germany")
     axR.set_ylabel("Δ % — Russia")
     axL.xaxis.set_major_locator(MaxNLocator(integer=True))
 
-    def y_label_pos(ax, frac=0.2):
-        y0, y1 = ax.get_ylim()
-        return y0 + frac * (y1 - y0)
-    
-     
-
-    
     #event markers (years since start)
     g_marker_year = [(1934, "WWII starts")]
     r_marker_year = [(2003, "Russia economic reforms end")]
@@ -390,16 +313,16 @@ def fig3a_since_regime_dual_axes_pct(df, col_entity, col_year, col_rol, outpath,
     r_t = [(x - r_start, label) for x, label in r_marker_year]
 
     # Germany markers
-    for x, label in g_t:
+    for x, _ in g_t:
         axL.axvline(x, 0, 1, linestyle="--", linewidth=0.8, color="red", zorder=0)
-        axL.text(x + 0.35, y_label_pos(axL), label,
-                 rotation=90, va="center", ha="center", color="red", fontsize=10, clip_on=False)
-        
+    annotate_events(axL, [x for x, _ in g_t], [label for _, label in g_t], base=0.2, lo=0.02, hi=0.98,
+                    colors="red", clip_on=False)
+
     # Russia marker
-    for x, label in r_t:
+    for x, _ in r_t:
         axR.axvline(x, 0, 1, linestyle="--", linewidth=0.8, color="black", zorder=0)
-        axR.text(x + 0.35, y_label_pos(axR), label,
-                 rotation=90, va="center", ha="center", color="grey", fontsize=10, clip_on=False)
+    annotate_events(axR, [x for x, _ in r_t], [label for _, label in r_t], base=0.2, lo=0.02, hi=0.98,
+                    colors="grey", clip_on=False)
 
     # endpoint annotations
     def endpoint(ax, s, color):
@@ -429,19 +352,17 @@ def fig3a_since_regime_dual_axes_pct(df, col_entity, col_year, col_rol, outpath,
 
 #FIGURE 4: Grouped bar chart pre vs war
 #FIGURE 4: 
-def fig4a_dual_axis(df, col_entity, col_year, col_rol, outpath):
+def fig4a_dual_axis(panel, outpath, indicator=None):
     """
     Grouped bar chart (Pre vs War) with TWO Y-AXES
       - Left Y-axis: Germany (pre/war)
       - Right Y-axis: Russia (pre/war)
       - Δ labels per country, value labels on bars
     """
+    panel = panel.select(indicator) if indicator else panel
 
     #period windows
-    g_pre = df[(df[col_entity].str.contains("Germany", na=False)) & (df[col_year].between(1930, 1932))][col_rol].mean()
-    g_war = df[(df[col_entity].str.contains("Germany", na=False)) & (df[col_year].between(1939, 1945))][col_rol].mean()
-    r_pre = df[(df[col_entity] == "Russia") & (df[col_year].between(2010, 2018))][col_rol].mean()
-    r_war = df[(df[col_entity] == "Russia") & (df[col_year].between(2022, 2024))][col_rol].mean()
+    g_pre, g_war, r_pre, r_war = pre_vs_war_means(panel)
 
     #x positions: 0 for Germany, 1 for Russia
     x = np.array([0, 1], dtype=float)
@@ -460,9 +381,9 @@ def fig4a_dual_axis(df, col_entity, col_year, col_rol, outpath):
     b_r_war = axR.bar(x[1] + width/2, r_war, width, color="black", alpha=1.0)
 
     #titles/axis
-    axL.set_title("Rule of Law — Pre vs War Period Averages")
-    axL.set_ylabel("Germany — Rule of Law Index")
-    axR.set_ylabel("Russia — Rule of Law Index")
+    axL.set_title(f"{panel.label} — Pre vs War Period Averages")
+    axL.set_ylabel(f"Germany — {panel.label} Index")
+    axR.set_ylabel(f"Russia — {panel.label} Index")
     axL.set_xticks(x)
     axL.set_xticklabels(["Germany", "Russia"])
     axL.grid(False)
@@ -525,12 +446,10 @@ def fig4a_dual_axis(df, col_entity, col_year, col_rol, outpath):
 
 
 #FIGURE 4: Grouped bar chart pre vs war averages with Δ labels
-def fig4_grouped(df, col_entity, col_year, col_rol, outpath):
+def fig4_grouped(panel, outpath, indicator=None):
+    panel = panel.select(indicator) if indicator else panel
     # Period windows
-    g_pre = df[(df[col_entity].str.contains("Germany")) & (df[col_year].between(1930, 1932))][col_rol].mean()
-    g_war = df[(df[col_entity].str.contains("Germany")) & (df[col_year].between(1939, 1945))][col_rol].mean()
-    r_pre = df[(df[col_entity] == "Russia") & (df[col_year].between(2010, 2018))][col_rol].mean()
-    r_war = df[(df[col_entity] == "Russia") & (df[col_year].between(2022, 2024))][col_rol].mean()
+    g_pre, g_war, r_pre, r_war = pre_vs_war_means(panel)
 
     x = np.arange(2)
     width = 0.42
@@ -542,8 +461,8 @@ def fig4_grouped(df, col_entity, col_year, col_rol, outpath):
     b_r_pre = ax.bar(x[1] - width/2, r_pre, width, color="black", alpha=0.5, label="Pre-war Russia")
     b_r_war = ax.bar(x[1] + width/2, r_war, width, color="black", alpha=1.0, label="War Russia")
 
-    ax.set_title("Rule of Law — Pre vs War Period Averages")
-    ax.set_ylabel("Rule of Law Index")
+    ax.set_title(f"{panel.label} — Pre vs War Period Averages")
+    ax.set_ylabel(f"{panel.label} Index")
     ax.set_xticks(x)
     ax.set_xticklabels(["Germany", "Russia"])
     ax.legend(loc="best", title="Series")
@@ -579,36 +498,194 @@ def fig4_grouped(df, col_entity, col_year, col_rol, outpath):
     plt.close(fig)
 
 
+#GENERIC PER-COUNTRY FIGURES (driven by a spec entry, see batch_figures.py / figure_spec.json)
+#spec keys: entity, period [start, end], color, stitch, shading [{start, end, label, color, alpha}],
+#           events [{year, label, highlight}], regime_start, horizon, pre [start, end], war [start, end]
+
+def fig_country_timeline(panel, spec, outpath):
+    name = spec["entity"]
+    start, end = spec["period"]
+    color = spec.get("color", "black")
+    if spec.get("stitch"):
+        years, vals = continuous_series(panel, name, start, end)
+    else:
+        years, vals = panel.series(name, start, end)
+    if len(vals) == 0:
+        return False
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(years, vals, linewidth=1.6, color=color)
+    ax.set_title(f"{name} — {panel.label} ({start}–{end})")
+    ax.set_xlabel("Year")
+    ax.set_ylabel(f"{panel.label} Index")
+
+    for shade in spec.get("shading", []):
+        ax.axvspan(shade["start"], shade["end"], alpha=shade.get("alpha", 0.1),
+                   color=shade.get("color", "grey"), label=shade.get("label"))
+
+    events = spec.get("events", [])
+    if events:
+        ev_years = [ev["year"] for ev in events]
+        for x in ev_years:
+            ax.axvline(x, linestyle="--", linewidth=0.8, color="grey")
+        ax.set_xlim(start, end)  #label widths are measured against the final x range
+        annotate_events(ax, ev_years, [ev["label"] for ev in events], base=0.5, lo=0.05, hi=0.95,
+                        y_line=np.interp(ev_years, years, vals), clearance=0.02,
+                        colors=["black" if ev.get("highlight") else "grey" for ev in events], clip_on=True)
+
+    if spec.get("shading"):
+        ax.legend(loc="upper right", fontsize=7.5)
+    ax.set_xlim(start, end)
+    ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+    ax.grid(True, linewidth=0.4, alpha=0.35)
+    plt.tight_layout()
+    fig.savefig(outpath, bbox_inches="tight")
+    plt.close(fig)
+    return True
+
+
+def fig_country_since_start(panel, spec, outpath, pct=False):
+    name = spec["entity"]
+    t0 = spec["regime_start"]
+    horizon = spec.get("horizon", 12)
+    if pct:
+        s, _ = _pct_since_start(panel, name, t0, horizon)
+        col = "delta_pct"
+    else:
+        s = delta_since_start(panel, name, t0, horizon)
+        col = "delta_pts"
+    if s is None or s.empty:
+        return False
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(s["t"], s[col], color=spec.get("color", "black"), linewidth=1.8, label=f"{name} (since {t0})")
+    ax.axhline(0, color="grey", linewidth=1.6, label="Baseline (t=0)")
+    for ev in spec.get("events", []):
+        if t0 <= ev["year"] <= t0 + horizon:
+            ax.axvline(ev["year"] - t0, linestyle="--", linewidth=0.8, color="grey", zorder=0)
+    t_end = s["t"].max()
+    v_end = float(s.loc[s["t"] == t_end, col].iloc[0])
+    ax.text(t_end, v_end, f"{v_end:+.1f}%" if pct else f"{v_end:+.2f}", va="center", ha="left", fontsize=8)
+    if pct:
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda v, pos: f"{v:.0f}%"))
+    ax.set_title(f"{'% ' if pct else ''}Change in {panel.label} — {name}, years since {t0}")
+    ax.set_xlabel("Years since start (t)")
+    ax.set_ylabel("Δ %" if pct else "Δ (index points)")
+    ax.set_xlim(0, horizon)
+    ax.xaxis.set_major_locator(MultipleLocator(1))
+    ax.legend(loc="best", fontsize=7.5)
+    ax.grid(True, axis="y", linewidth=0.4, alpha=0.2)
+    plt.tight_layout()
+    fig.savefig(outpath, bbox_inches="tight")
+    plt.close(fig)
+    return True
+
+
+def fig_country_pre_vs_war(panel, spec, outpath):
+    name = spec["entity"]
+    rows = lineage_rows(panel, name) if spec.get("stitch") else name
+    pre, war = window_stats(panel, [(rows, "pre", *spec["pre"]), (rows, "war", *spec["war"])])["mean"]
+    if np.isnan(pre) or np.isnan(war):
+        return False
+
+    color = spec.get("color", "black")
+    width = 0.42
+    fig, ax = plt.subplots(figsize=(6, 6))
+    ax.bar(-width/2, pre, width, color=color, alpha=0.5, label=f"Pre ({spec['pre'][0]}–{spec['pre'][1]})")
+    ax.bar(width/2, war, width, color=color, alpha=1.0, label=f"War ({spec['war'][0]}–{spec['war'][1]})")
+    for x, v in ((-width/2, pre), (width/2, war)):
+        ax.text(x, v, f"{v:.2f}", ha="center", va="bottom", fontsize=8)
+    ax.text(0, (pre + war) / 2, f"Δ {name}: {war - pre:+.2f}", ha="center", va="center", fontsize=9,
+            bbox=dict(boxstyle="round,pad=0.2", fc="white", ec="none", alpha=0.7))
+    ax.set_title(f"{name} — {panel.label}: Pre vs War Period Averages")
+    ax.set_ylabel(f"{panel.label} Index")
+    ax.set_xticks([0])
+    ax.set_xticklabels([name])
+    ax.legend(loc="best")
+    plt.tight_layout()
+    fig.savefig(outpath, bbox_inches="tight")
+    plt.close(fig)
+    return True
+
+
+#FIGURE 5: overlay of many regime starts with cross-event mean and quantile band
+def fig5_event_overlay(panel, events, outpath, horizon=12, pct=False, indicator=None):
+    panel = panel.select(indicator) if indicator else panel
+    m = event_matrix(panel, events, horizon)
+    mat = m["pct"] if pct else m["delta"]
+    bands = event_bands(mat, (0.1, 0.5, 0.9))
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    #each event as a faint line, all in one call
+    ax.plot(m["t"], mat.T, color="grey", linewidth=0.6, alpha=max(0.05, min(0.6, 20 / max(len(events), 1))))
+    ax.fill_between(m["t"], bands["quantiles"][0.1], bands["quantiles"][0.9], color="red", alpha=0.15,
+                    label="10–90% of events")
+    ax.plot(m["t"], bands["quantiles"][0.5], color="red", linewidth=1.2, linestyle="--", label="Median")
+    ax.plot(m["t"], bands["mean"], color="red", linewidth=2.0, label="Mean")
+    ax.axhline(0, color="grey", linewidth=1.2)
+
+    ax.set_title(f"{'% ' if pct else ''}Change in {panel.label} — {len(events)} events since start")
+    ax.set_xlabel("Years since start (t)")
+    ax.set_ylabel("Δ %" if pct else "Δ (index points)")
+    ax.xaxis.set_major_locator(MultipleLocator(1))
+    ax.set_xlim(0, horizon)
+    ax.legend(loc="best", fontsize=7.5)
+    ax.grid(True, axis="y", linewidth=0.4, alpha=0.2)
+    plt.tight_layout()
+    fig.savefig(outpath, bbox_inches="tight")
+    plt.close(fig)
+
+
 # ------------------------------------------------------------
 # Main
 # ------------------------------------------------------------
 def main():
     ap = argparse.ArgumentParser(description="Generate rule-of-law figures (Germany & Russia).")
     ap.add_argument("--csv", default="/Users/amelia/DAT5501-portfolio/lab06_rule_of_law_group_project/data/raw/rule_of_law.csv", help="Path to rule_of_law.csv")
+    ap.add_argument("--indicator", default="Rule of Law index",
+                    help="Indicator to plot (column name or a unique part of it, e.g. 'Liberal democracy')")
     ap.add_argument("--outdir", default="/Users/amelia/DAT5501-portfolio/lab06_rule_of_law_group_project/artifacts/figures", help="Output directory")
+    ap.add_argument("--force", action="store_true", help="Re-render every figure even if its inputs are unchanged")
     args = ap.parse_args()
 
     outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
 
     set_matplotlib_defaults()
-    df, col_entity, col_year, col_rol = load_data(args.csv)
-
-    fig1_germany(df, col_entity, col_year, col_rol, outdir / "fig1_germany_1930_1950.png")
-    fig2_russia(df, col_entity, col_year, col_rol, outdir / "fig2_russia_1999_2024.png")
-    fig3_since_regime_topbaseline(df, col_entity, col_year, col_rol, outdir / "fig3_since_regime_start_topbaseline.png")
-    fig3a_since_regime_dual_axes_pct(df, col_entity, col_year, col_rol, outpath=outdir / "fig3a_since_regime_dual_pct.png")
-    fig4_grouped(df, col_entity, col_year, col_rol, outdir / "fig4_grouped_pre_vs_war.png")
-    fig4a_dual_axis(df, col_entity, col_year, col_rol, outdir / "fig4a_dual_axis.png")
+    panel = load_data(args.csv, args.indicator)
+
+    #(file, figure function, entities whose rows it reads); a trailing * also reads the entity's
+    #lineage, e.g. East/West Germany for the stitched series
+    figures = [
+        ("fig1_germany_1930_1950.png", fig1_germany, ["Germany*"]),
+        ("fig2_russia_1999_2024.png", fig2_russia, ["Russia"]),
+        ("fig3_since_regime_start_topbaseline.png", fig3_since_regime_topbaseline, ["Germany", "Russia"]),
+        ("fig3a_since_regime_dual_pct.png", fig3a_since_regime_dual_axes_pct, ["Germany", "Russia"]),
+        ("fig4_grouped_pre_vs_war.png", fig4_grouped, ["Germany*", "Russia"]),
+        ("fig4a_dual_axis.png", fig4a_dual_axis, ["Germany*", "Russia"]),
+    ]
 
+    #skip figures whose data slice, parameters and code are unchanged since the last build
+    manifest = BuildManifest(outdir / MANIFEST_NAME)
+    code = code_version()
+    saved, unchanged = [], []
+    for name, fn, entities in figures:
+        outpath = outdir / name
+        rows = [r for e in entities for r in entity_rows(panel, e.rstrip("*"), stitch=e.endswith("*"))]
+        key = figure_key(slice_hash(panel, rows), {"figure": fn.__name__}, code)
+        if not args.force and manifest.is_fresh(outpath, key):
+            unchanged.append(outpath)
+            continue
+        fn(panel, outpath)
+        manifest.record(outpath, key)
+        saved.append(outpath)
+    manifest.save()
 
     print("Saved:")
-    print(outdir / "fig1_germany_1930_1950.png")
-    print(outdir / "fig2_russia_1999_2024.png")
-    print(outdir / "fig3_since_regime_start_topbaseline.png")
-    print(outdir / "fig3a_since_regime_dual_pct.png")
-    print(outdir / "fig4_grouped_pre_vs_war.png")
-    print(outdir / "fig4a_dual_axis.png")
+    for path in saved:
+        print(path)
+    if unchanged:
+        print(f"Up to date ({len(unchanged)}): " + ", ".join(p.name for p in unchanged))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,148 @@
+# Dense indicator x entity x year panel: every series, window mean and interpolation is an O(1) slice
+import numpy as np
+import pandas as pd
+
+
+def short_label(indicator):
+    # "Rule of Law index (central estimate)" -> "Rule of Law"
+    label = indicator.replace(" (central estimate)", "")
+    return label[:-len(" index")] if label.endswith(" index") else label
+
+
+class Panel:
+    """
+    data[k, i, j] is indicator k for entity i in year years[j] (NaN where missing).
+    One indicator is active at a time; `values` is its entity x year slice and
+    select() returns a view with a different active indicator (no copy).
+    Years are a contiguous range, so a year maps to its column by subtraction.
+    """
+
+    def __init__(self, data, entities, years, codes=None, indicators=None, active=0):
+        if data.ndim == 2:
+            data = data[None]
+        self.data = data
+        self.entities = list(entities)
+        self.years = np.asarray(years)
+        self.year0 = int(self.years[0])
+        self.indicators = list(indicators) if indicators is not None else [None] * data.shape[0]
+        self.active = active
+        self.entity_index = {e: i for i, e in enumerate(self.entities)}
+        self.year_index = {int(y): j for j, y in enumerate(self.years)}
+        self.code_index = {}
+        if codes is not None:
+            self.code_index = {c: i for i, c in enumerate(codes) if isinstance(c, str)}
+        self.cache = {}  # derived arrays keyed by (kind, active indicator, ...), see period_windows / lineage
+
+    @property
+    def values(self):
+        return self.data[self.active]
+
+    @property
+    def indicator(self):
+        return self.indicators[self.active]
+
+    @property
+    def label(self):
+        return short_label(self.indicator) if self.indicator else "Value"
+
+    def indicator_position(self, name):
+        # exact column name, or a case-insensitive substring such as "Rule of Law"
+        if name in self.indicators:
+            return self.indicators.index(name)
+        hits = [k for k, ind in enumerate(self.indicators) if ind and name.lower() in ind.lower()]
+        if len(hits) != 1:
+            raise KeyError(f"Indicator {name!r} matches {len(hits)} columns: {self.indicators}")
+        return hits[0]
+
+    def select(self, name):
+        # same arrays and lookups, different active indicator
+        view = object.__new__(Panel)
+        view.__dict__.update(self.__dict__)
+        view.active = self.indicator_position(name)
+        return view
+
+    @classmethod
+    def from_frame(cls, df, col_entity, col_year, col_values, col_code=None, dtype=float):
+        # col_values may be one column name or a list of indicator columns
+        if isinstance(col_values, str):
+            col_values = [col_values]
+        entity_col = df[col_entity]
+        if isinstance(entity_col.dtype, pd.CategoricalDtype):
+            entities = list(entity_col.cat.categories)
+            rows = entity_col.cat.codes.to_numpy()
+        else:
+            entities, rows = np.unique(entity_col.to_numpy(), return_inverse=True)
+        year_vals = df[col_year].to_numpy().astype(np.int64)
+        y0, y1 = year_vals.min(), year_vals.max()
+        data = np.full((len(col_values), len(entities), y1 - y0 + 1), np.nan, dtype=dtype)
+        data[:, rows, year_vals - y0] = df[col_values].to_numpy(dtype=dtype).T
+        codes = None
+        if col_code is not None and col_code in df.columns:
+            first = df.drop_duplicates(col_entity).set_index(col_entity)[col_code]
+            codes = [first.get(e) for e in entities]
+        return cls(data, entities, np.arange(y0, y1 + 1), codes, col_values)
+
+    def rows_matching(self, text):
+        # row indices of entities whose name contains text (scans names, not data rows)
+        return [i for i, e in enumerate(self.entities) if text in e]
+
+    def row(self, entity):
+        # accepts an entity name or a code
+        i = self.entity_index.get(entity)
+        if i is None:
+            i = self.code_index[entity]
+        return self.values[i]
+
+    def cols(self, start, end):
+        # column slice for the inclusive year range, clipped to the panel
+        lo = min(max(int(np.floor(start)) - self.year0, 0), len(self.years))
+        hi = min(int(np.floor(end)) - self.year0 + 1, len(self.years))
+        return slice(lo, max(hi, lo))
+
+    def series(self, entity, start=None, end=None, dropna=True):
+        # (years, values) for an entity between start and end inclusive
+        start = self.years[0] if start is None else start
+        end = self.years[-1] if end is None else end
+        sl = self.cols(start, end)
+        years, vals = self.years[sl], self.row(entity)[sl].astype(float)
+        if dropna:
+            keep = ~np.isnan(vals)
+            years, vals = years[keep], vals[keep]
+        return years, vals
+
+    def value_at(self, entity, year):
+        # linear interpolation between observed years (flat beyond the ends)
+        years, vals = self.series(entity)
+        return float(np.interp(year, years, vals))
+
+    def window_mean(self, entities, start, end):
+        # pooled mean over one entity name or a list of row indices/names
+        if isinstance(entities, str):
+            block = self.row(entities)[self.cols(start, end)].astype(float)
+        else:
+            idx = [self.entity_index[e] if isinstance(e, str) else e for e in entities]
+            block = self.values[idx, self.cols(start, end)].astype(float)
+        return float(np.nanmean(block)) if np.any(~np.isnan(block)) else np.nan
+
+    def interpolated(self, vals):
+        # fill gaps in a dense year-aligned vector by linear interpolation (ends held flat)
+        vals = np.asarray(vals, dtype=float)
+        keep = ~np.isnan(vals)
+        if not keep.any():
+            return vals
+        x = np.arange(len(vals))
+        return np.interp(x, x[keep], vals[keep])
+
+
+def load_panel(csv_path, col_entity="Entity", col_year="Year", col_code="Code"):
+    """
+    Read the democracy CSV once with compact dtypes (categorical entity/code, int16 year,
+    float32 indicators) and pack every indicator column into one indicator x entity x year array.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    indicators = [c for c in header if c not in (col_entity, col_year, col_code)]
+    dtypes = {col_entity: "category", col_code: "category", col_year: "int16"}
+    dtypes.update({c: "float32" for c in indicators})
+    df = pd.read_csv(csv_path, dtype=dtypes)
+    df = df.dropna(subset=[col_entity, col_year])
+    return Panel.from_frame(df, col_entity, col_year, indicators, col_code=col_code, dtype=np.float32)
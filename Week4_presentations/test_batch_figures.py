@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from rol_panel import Panel
+from batch_figures import load_spec, expand_entries, jobs_for, build_all
+
+SPEC = {
+    "countries": [
+        {"entity": "Germany", "period": [2000, 2010], "regime_start": 2004, "pre": [2000, 2003],
+         "war": [2006, 2010], "events": [{"year": 2004, "label": "Start (2004)"}]},
+        {"entity": "New Zealand", "period": [2000, 2010]},
+    ],
+    "all_entities": {"enabled": False, "period": [2000, 2010], "pre": [2000, 2004], "war": [2005, 2010]},
+}
+
+
+class TestBatchFigures(unittest.TestCase):
+    def setUp(self):
+        years = np.arange(2000, 2011)
+        rng = np.random.default_rng(0)
+        frames = [pd.DataFrame({'Entity': name, 'Year': years, 'Value': rng.uniform(0.2, 0.9, len(years))})
+                  for name in ['Germany', 'New Zealand', 'Chile']]
+        frames.append(pd.DataFrame({'Entity': 'Empty', 'Year': years, 'Value': np.nan}))
+        self.panel = Panel.from_frame(pd.concat(frames), 'Entity', 'Year', 'Value')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.spec_path = os.path.join(self.tmp.name, 'spec.json')
+        with open(self.spec_path, 'w') as f:
+            json.dump(SPEC, f)
+
+    def test_spec_defaults_and_all_expansion(self):
+        spec = load_spec(self.spec_path)
+        self.assertEqual([e['entity'] for e in expand_entries(spec, self.panel)], ['Germany', 'New Zealand'])
+        spec['all_entities']['enabled'] = True  # what --all does
+        entries = expand_entries(spec, self.panel)
+        self.assertEqual([e['entity'] for e in entries], ['Germany', 'New Zealand', 'Chile'])  # no all-NaN entity
+        self.assertEqual(entries[-1]['pre'], [2000, 2004])
+        self.assertNotIn('enabled', entries[-1])
+        kinds = [kind for kind, _ in jobs_for(entries[0], 'out')]
+        self.assertEqual(kinds, ['timeline', 'since_start', 'since_start_pct', 'pre_vs_war'])
+        self.assertEqual([str(p) for _, p in jobs_for(entries[1], 'out')],
+                         [os.path.join('out', 'new_zealand', 'timeline_2000_2010.png')])
+
+    def test_build_all_in_worker_process(self):
+        outdir = Path(self.tmp.name) / 'figures'
+        results = build_all(load_spec(self.spec_path), self.panel, outdir, workers=1)
+        self.assertEqual([r[3] for r in results], ['ok'] * 5, results)
+        expected = ['germany/pre_vs_war.png', 'germany/since_2004.png', 'germany/since_2004_pct.png',
+                    'germany/timeline_2000_2010.png', 'new_zealand/timeline_2000_2010.png']
+        written = sorted(str(p.relative_to(outdir)).replace(os.sep, '/') for p in outdir.rglob('*.png'))
+        self.assertEqual(written, expected)
+        again = build_all(load_spec(self.spec_path), self.panel, outdir, workers=1)
+        self.assertEqual({r[3] for r in again}, {'up to date'})
+
+
+if __name__ == '__main__':
+    unittest.main()
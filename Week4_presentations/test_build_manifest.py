@@ -0,0 +1,73 @@
+import ast
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from rol_panel import Panel
+from build_manifest import _CODE_FILES, BuildManifest, entity_rows, figure_key, slice_hash
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        df = pd.DataFrame({
+            'Entity': ['Germany', 'Germany', 'B', 'B', 'East Germany'],
+            'Year': [2000, 2001, 2000, 2001, 2000],
+            'Value': [1.0, 2.0, 3.0, np.nan, 5.0],
+        })
+        self.panel = Panel.from_frame(df, 'Entity', 'Year', 'Value')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_entity_rows(self):
+        self.assertEqual(len(entity_rows(self.panel, 'Germany')), 1)
+        self.assertEqual(len(entity_rows(self.panel, 'Germany', stitch=True)), 2)  # plus its lineage
+        self.assertEqual(entity_rows(self.panel, 'missing'), [])
+
+    def test_slice_hash_only_changes_for_touched_rows(self):
+        a, b = entity_rows(self.panel, 'Germany'), entity_rows(self.panel, 'B')
+        before_a, before_b = slice_hash(self.panel, a), slice_hash(self.panel, b)
+        self.panel.values[b[0], 1] = 4.0  # data correction for B only
+        self.assertEqual(slice_hash(self.panel, a), before_a)
+        self.assertNotEqual(slice_hash(self.panel, b), before_b)
+        self.assertNotEqual(figure_key(before_a, {'kind': 'x'}, 'v1'), figure_key(before_a, {'kind': 'x'}, 'v2'))
+
+    def test_fresh_after_record_and_reload(self):
+        path = os.path.join(self.tmp.name, 'manifest.json')
+        out = os.path.join(self.tmp.name, 'fig.png')
+        empty = os.path.join(self.tmp.name, 'empty.png')
+        manifest = BuildManifest(path)
+        self.assertFalse(manifest.is_fresh(out, 'k1'))
+        open(out, 'wb').close()
+        manifest.record(out, 'k1')
+        manifest.record(empty, 'k2', written=False)
+        manifest.save()
+
+        reloaded = BuildManifest(path)
+        self.assertTrue(reloaded.is_fresh(out, 'k1'))
+        self.assertFalse(reloaded.is_fresh(out, 'k2'))
+        self.assertTrue(reloaded.is_fresh(empty, 'k2'))  # nothing to plot last time, nothing to redo
+        os.remove(out)
+        self.assertFalse(reloaded.is_fresh(out, 'k1'))  # deleted output is rebuilt
+
+    def test_code_files_cover_figure_modules(self):
+        # every local module reachable from the figure scripts is part of the code version
+        here = os.path.dirname(os.path.abspath(__file__))
+        todo, seen = ['plot_rol_figures.py', 'batch_figures.py'], set()
+        while todo:
+            name = todo.pop()
+            seen.add(name)
+            with open(os.path.join(here, name)) as f:
+                tree = ast.parse(f.read())
+            for node in ast.walk(tree):
+                mods = [a.name for a in node.names] if isinstance(node, ast.Import) else \
+                       [node.module] if isinstance(node, ast.ImportFrom) and node.module else []
+                for mod in mods:
+                    path = mod + '.py'
+                    if os.path.exists(os.path.join(here, path)) and path not in seen:
+                        todo.append(path)
+        self.assertLessEqual(seen, set(_CODE_FILES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import itertools
+import unittest
+import numpy as np
+import pandas as pd
+from rol_panel import Panel
+from changepoints import segment_batch, detect_block, detect_all, events_from_breakpoints
+
+
+def brute_force(y, penalty, min_size):
+    # try every set of breakpoints (small n only)
+    n = len(y)
+    best, best_breaks = np.inf, []
+    for k in range(n // min_size):
+        for breaks in itertools.combinations(range(min_size, n - min_size + 1), k):
+            bounds = [0, *breaks, n]
+            if any(b - a < min_size for a, b in zip(bounds[:-1], bounds[1:])):
+                continue
+            cost = sum(((y[a:b] - y[a:b].mean()) ** 2).sum() for a, b in zip(bounds[:-1], bounds[1:]))
+            cost += penalty * k
+            if cost < best - 1e-12:
+                best, best_breaks = cost, list(breaks)
+    return best_breaks
+
+
+class TestChangepoints(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        Y = np.round(rng.normal(size=(5, 11)) + np.repeat([[0, 2, -1]], 5, axis=0).repeat([4, 4, 3], axis=1), 3)
+        got = segment_batch(Y, [11, 11, 11, 9, 7], [0.5, 1.0, 2.0, 0.5, 0.5], min_size=2)
+        for row, n, pen, breaks in zip(Y, [11, 11, 11, 9, 7], [0.5, 1.0, 2.0, 0.5, 0.5], got):
+            self.assertEqual(breaks, brute_force(row[:n], pen, 2))
+
+    def test_step_with_gaps(self):
+        years = np.arange(1990, 2010)
+        vals = np.where(years < 2000, 0.8, 0.2)
+        vals[[3, 12]] = np.nan  # missing years are skipped, not treated as zero
+        [breaks] = detect_block(years, vals[None], penalty=0.01)
+        self.assertEqual(len(breaks), 1)
+        year, before, after = breaks[0]
+        self.assertEqual(year, 2000)
+        self.assertAlmostEqual(before, 0.8)
+        self.assertAlmostEqual(after, 0.2)
+
+    def test_detect_all_and_events(self):
+        df = pd.DataFrame({
+            'Entity': ['A'] * 12 + ['B'] * 12,
+            'Year': list(range(2000, 2012)) * 2,
+            'Rule of Law index': [0.9] * 6 + [0.3] * 6 + [0.5] * 12,
+            'Other index': [0.1] * 6 + [0.6] * 6 + [0.5] * 12,
+        })
+        panel = Panel.from_frame(df, 'Entity', 'Year', ['Rule of Law index', 'Other index'])
+        table = detect_all(panel, min_delta=0.1, workers=1)
+        self.assertEqual(table[['entity', 'year']].values.tolist(), [['A', 2006], ['A', 2006]])
+        self.assertEqual(events_from_breakpoints(table, 'Rule of Law'), [('A', 2006)])
+        self.assertEqual(events_from_breakpoints(table, 'Other'), [])
+        self.assertEqual(events_from_breakpoints(table, 'Other', direction=1), [('A', 2006)])
+
+
+if __name__ == '__main__':
+    unittest.main()
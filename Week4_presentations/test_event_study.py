@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+import pandas as pd
+from rol_panel import Panel
+from event_study import fill_gaps, event_matrix, event_bands
+
+
+class TestEventStudy(unittest.TestCase):
+    def setUp(self):
+        df = pd.DataFrame({
+            'Entity': ['A'] * 4 + ['B'] * 3,
+            'Year': [2000, 2001, 2003, 2004, 2000, 2001, 2002],
+            'Value': [1.0, 2.0, 4.0, 5.0, 10.0, 8.0, 6.0],
+        })
+        self.panel = Panel.from_frame(df, 'Entity', 'Year', 'Value')
+
+    def test_fill_gaps_matches_np_interp(self):
+        rows = np.array([[np.nan, 1.0, np.nan, np.nan, 4.0, np.nan],
+                         [np.nan] * 6])
+        filled = fill_gaps(rows)
+        x = np.arange(6)
+        np.testing.assert_allclose(filled[0], np.interp(x, [1, 4], [1.0, 4.0]))
+        self.assertTrue(np.all(np.isnan(filled[1])))
+
+    def test_event_matrix(self):
+        m = event_matrix(self.panel, [('A', 2002), ('B', 2000), ('missing', 2000)], horizon=2)
+        np.testing.assert_allclose(m['base'][:2], [3.0, 10.0])
+        # A is unobserved in 2002, so t=0 is NaN but the baseline is interpolated
+        np.testing.assert_allclose(m['delta'][0], [np.nan, 1.0, 2.0])
+        np.testing.assert_allclose(m['delta'][1], [0.0, -2.0, -4.0])
+        np.testing.assert_allclose(m['pct'][1], [0.0, -20.0, -40.0])
+        self.assertTrue(np.all(np.isnan(m['delta'][2])))
+
+    def test_fractional_start(self):
+        m = event_matrix(self.panel, [('A', 2000.5)], horizon=2)
+        np.testing.assert_allclose(m['base'], [1.5])
+        np.testing.assert_allclose(m['t_exact'][0], [0.5, 1.5, 2.5])
+        np.testing.assert_allclose(m['delta'][0], [0.5, np.nan, np.nan])
+
+    def test_bands(self):
+        mat = np.array([[0.0, 1.0], [0.0, 3.0], [0.0, np.nan]])
+        bands = event_bands(mat, (0.5,))
+        np.testing.assert_allclose(bands['mean'], [0.0, 2.0])
+        np.testing.assert_allclose(bands['quantiles'][0.5], [0.0, 2.0])
+        np.testing.assert_array_equal(bands['count'], [3, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from label_layout import layout_labels
+
+
+def overlaps(xs, ys, heights, width):
+    # pairs of labels in the same column whose vertical extents intersect
+    bad = 0
+    for i in range(len(xs)):
+        for j in range(i + 1, len(xs)):
+            if abs(xs[i] - xs[j]) < width and abs(ys[i] - ys[j]) < (heights[i] + heights[j]) / 2 - 1e-9:
+                bad += 1
+    return bad
+
+
+class TestLabelLayout(unittest.TestCase):
+    def test_isolated_labels_stay_at_base(self):
+        ys = layout_labels([0, 5, 10], 0.2, width=1.0, base=0.5, n_slots=100)
+        np.testing.assert_allclose(ys, 0.5, atol=0.01)
+
+    def test_crowded_column_has_no_overlaps(self):
+        xs = np.array([0.0, 0.1, 0.2, 3.0])
+        heights = np.array([0.3, 0.3, 0.3, 0.3])
+        ys = layout_labels(xs, heights, width=1.0, base=0.5)
+        self.assertEqual(overlaps(xs, ys, heights, 1.0), 0)
+        self.assertTrue(np.all(ys - heights / 2 >= -1e-9) and np.all(ys + heights / 2 <= 1 + 1e-9))
+
+    def test_avoids_data_line_when_there_is_room(self):
+        ys = layout_labels([0.0], [0.3], width=1.0, base=0.5, avoid=[0.5], clearance=0.02)
+        self.assertTrue(abs(ys[0] - 0.5) >= 0.15 + 0.02 - 1e-9)
+
+    def test_many_labels(self):
+        rng = np.random.default_rng(0)
+        xs = np.sort(rng.uniform(0, 100, 400))
+        heights = rng.uniform(0.05, 0.2, 400)
+        ys = layout_labels(xs, heights, width=0.5)
+        self.assertEqual(len(ys), 400)
+        # only columns with more labels than fit in the band may overlap
+        self.assertLess(overlaps(xs, ys, heights, 0.5), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
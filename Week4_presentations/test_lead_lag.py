@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from lead_lag import lagged_correlations, pooled, lead_lag_table, save_table, load_table
+
+
+class TestLeadLag(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        years = 60
+        lead = rng.normal(size=(3, years)).cumsum(axis=1)
+        follow = np.full_like(lead, np.nan)
+        follow[:, 2:] = lead[:, :-2] + 0.1 * rng.normal(size=(3, years - 2))  # follows by 2 years
+        data = np.stack([lead, follow])
+        data[0, 1, 10:20] = np.nan  # gaps in one entity
+        self.data = data
+
+    def test_matches_pandas_pairwise(self):
+        r, n = lagged_correlations(self.data, max_lag=3, min_obs=5)
+        for e in range(3):
+            for lag in range(-3, 4):
+                a = pd.Series(self.data[0, e])
+                b = pd.Series(self.data[1, e]).shift(-lag)
+                self.assertAlmostEqual(float(r[e, 0, 1, 3 + lag]), a.corr(b), places=5)
+                self.assertEqual(int(n[e, 0, 1, 3 + lag]), int((a.notna() & b.notna()).sum()))
+
+    def test_lead_is_found(self):
+        r, n = lagged_correlations(self.data, max_lag=5, min_obs=5)
+        table = lead_lag_table(r, n, ['Lead index', 'Rule of Law index'], 'Rule of Law', max_lag=5)
+        self.assertEqual(table['best_lag'].tolist(), [2])
+        self.assertGreater(table['r_best'][0], 0.95)
+        np.testing.assert_allclose(pooled(r, n)[0, 0, 5], 1.0, atol=1e-5)
+
+    def test_short_overlap_is_nan_and_roundtrip(self):
+        r, n = lagged_correlations(self.data[:, :, :8], max_lag=2, min_obs=10)
+        self.assertTrue(np.all(np.isnan(r)))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'lead_lag.npz')
+            save_table(path, r, n, ['A', 'B', 'C'], ['x', 'y'], 2)
+            table = load_table(path)
+            self.assertEqual(table['r'].dtype, np.float32)
+            self.assertEqual(table['lags'].tolist(), [-2, -1, 0, 1, 2])
+            self.assertEqual(table['entities'].tolist(), ['A', 'B', 'C'])
+
+
+if __name__ == '__main__':
+    unittest.main()
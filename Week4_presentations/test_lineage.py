@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+import pandas as pd
+from rol_panel import Panel
+from lineage import lineage_rows, stitch_all, stitched_row
+
+
+class TestLineage(unittest.TestCase):
+    def setUp(self):
+        df = pd.DataFrame({
+            'Entity': ['New'] * 3 + ['West Old'] * 3 + ['East Old'] * 2 + ['Other'] * 2,
+            'Year': [2000, 2001, 2006, 2002, 2003, 2004, 2002, 2003, 2001, 2004],
+            'Value': [1.0, 2.0, 6.0, 3.0, 4.0, 9.0, 5.0, 6.0, 1.0, 4.0],
+        })
+        self.panel = Panel.from_frame(df, 'Entity', 'Year', 'Value')
+        # West Old only counts up to 2003, so its 2004 value is ignored
+        self.lineages = {'New': [('West Old', 2002, 2003), ('East Old', None, None), ('Gone', None, None)]}
+
+    def test_pools_predecessors_and_fills_interior(self):
+        table = stitch_all(self.panel, self.lineages)
+        self.assertEqual(table['entities'], ['New'])
+        row = table['values'][0]
+        # 2000-2001 own, 2002-2003 mean of West/East Old, 2004-2005 interpolated, 2006 own
+        np.testing.assert_allclose(row, [1.0, 2.0, 4.0, 5.0, 16 / 3, 17 / 3, 6.0])
+        self.assertEqual(table['observed'][0].tolist(), [True, True, True, True, False, False, True])
+        self.assertEqual(len(lineage_rows(self.panel, 'New', self.lineages)), 3)
+
+    def test_entity_without_lineage_and_cache(self):
+        row = stitched_row(self.panel, 'Other', self.lineages)
+        np.testing.assert_allclose(row, [np.nan, 1.0, 2.0, 3.0, 4.0, np.nan, np.nan])  # ends stay NaN
+        self.assertIs(stitch_all(self.panel, self.lineages), stitch_all(self.panel, self.lineages))
+
+
+if __name__ == '__main__':
+    unittest.main()
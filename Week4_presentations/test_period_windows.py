@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+import pandas as pd
+from rol_panel import Panel
+from period_windows import window_stats
+
+
+class TestWindowStats(unittest.TestCase):
+    def setUp(self):
+        df = pd.DataFrame({
+            'Entity': ['A'] * 5 + ['B'] * 3 + ['East A'],
+            'Year': [2000, 2001, 2002, 2003, 2004, 2000, 2001, 2004, 2001],
+            'Value': [1.0, 2.0, 3.0, np.nan, 5.0, 10.0, 8.0, 4.0, 7.0],
+        })
+        self.panel = Panel.from_frame(df, 'Entity', 'Year', 'Value')
+
+    def test_matches_window_mean(self):
+        windows = [('A', 'pre', 2000, 2001), ('A', 'war', 2002, 2004), ('B', 'pre', 2000, 2004)]
+        out = window_stats(self.panel, windows)
+        expected = [self.panel.window_mean(e, s, t) for e, _, s, t in windows]
+        np.testing.assert_allclose(out['mean'], expected)
+        np.testing.assert_allclose(out['median'], [1.5, 4.0, 8.0])
+        self.assertEqual(out['count'].tolist(), [2, 2, 3])
+        # delta is relative to each entity's first window
+        np.testing.assert_allclose(out['delta'], [0.0, 2.5, 0.0])
+
+    def test_pooled_and_empty_windows(self):
+        pooled = self.panel.rows_matching('A')
+        out = window_stats(self.panel, [(pooled, 'all', 2000, 2001), ('A', 'none', 1990, 1995),
+                                        ('missing', 'x', 2000, 2004)])
+        self.assertAlmostEqual(out['mean'][0], self.panel.window_mean(pooled, 2000, 2001))
+        self.assertEqual(out['median'][0], 2.0)
+        self.assertEqual(out['entity'][0], 'A+East A')
+        self.assertTrue(np.isnan(out['mean'][1]) and np.isnan(out['median'][1]))
+        self.assertEqual(out['count'].tolist(), [3, 0, 0])
+
+    def test_window_after_last_year(self):
+        out = window_stats(self.panel, [('A', 'late', 2030, 2035), ('B', 'pre', 2000, 2001)])
+        self.assertEqual(out['count'].tolist(), [0, 2])
+        self.assertTrue(np.isnan(out['mean'][0]) and np.isnan(out['median'][0]))
+        self.assertEqual(self.panel.cols(2030, 2035), slice(5, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
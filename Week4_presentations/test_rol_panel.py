@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from rol_panel import Panel, load_panel
+
+
+class TestPanel(unittest.TestCase):
+    def setUp(self):
+        df = pd.DataFrame({
+            'Entity': ['A', 'A', 'A', 'B', 'B', 'East B'],
+            'Code': ['AAA', 'AAA', 'AAA', 'BBB', 'BBB', None],
+            'Year': [2000, 2001, 2003, 2000, 2002, 2001],
+            'Value': [1.0, 2.0, 4.0, 10.0, 12.0, 20.0],
+        })
+        self.panel = Panel.from_frame(df, 'Entity', 'Year', 'Value', col_code='Code')
+
+    def test_dense_layout(self):
+        self.assertEqual(self.panel.values.shape, (3, 4))
+        self.assertEqual(list(self.panel.years), [2000, 2001, 2002, 2003])
+        self.assertTrue(np.isnan(self.panel.row('A')[2]))
+        np.testing.assert_array_equal(self.panel.row('BBB'), self.panel.row('B'))
+
+    def test_series_and_interpolation(self):
+        years, vals = self.panel.series('A', 2001, 2003)
+        np.testing.assert_array_equal(years, [2001, 2003])
+        np.testing.assert_array_equal(vals, [2.0, 4.0])
+        self.assertAlmostEqual(self.panel.value_at('A', 2002), 3.0)
+        np.testing.assert_array_equal(self.panel.interpolated(self.panel.row('A')), [1, 2, 3, 4])
+
+    def test_window_mean(self):
+        self.assertAlmostEqual(self.panel.window_mean('B', 2000, 2003), 11.0)
+        # pooled over every entity whose name contains 'B'
+        self.assertAlmostEqual(self.panel.window_mean(self.panel.rows_matching('B'), 2000, 2001), 15.0)
+        self.assertTrue(np.isnan(self.panel.window_mean('A', 2002, 2002)))
+
+
+class TestLoadPanel(unittest.TestCase):
+    def test_all_indicators_in_one_array(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'demo.csv')
+            with open(path, 'w') as f:
+                f.write('Entity,Code,Year,Liberal democracy index (central estimate),'
+                        'Rule of Law index (central estimate)\n'
+                        'A,AAA,2000,0.5,0.25\n'
+                        'A,AAA,2001,,0.5\n'
+                        'B,BBB,2001,0.75,\n')
+            panel = load_panel(path)
+        self.assertEqual(panel.data.shape, (2, 2, 2))
+        self.assertEqual(panel.data.dtype, np.float32)
+        rol = panel.select('Rule of Law')
+        self.assertEqual(rol.label, 'Rule of Law')
+        np.testing.assert_array_equal(rol.row('A'), [0.25, 0.5])
+        lib = rol.select('liberal democracy')
+        self.assertIs(lib.data, rol.data)
+        self.assertEqual(lib.value_at('B', 2001), 0.75)
+        with self.assertRaises(KeyError):
+            panel.select('index')  # ambiguous
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# Streaming statistics of daily percent changes for price files too large to load at once
+#
+#   python price_stream.py intraday.csv --chunksize 1000000
+import argparse
+import io
+
+import numpy as np
+import pandas as pd
+
+from cocacola_asset_price import DATA_PATH
+
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max of a stream of values in constant memory (Welford).
+    update() folds a whole array in at once: its own mean / sum of squared deviations are merged
+    into the running ones with the pairwise form of Welford's update (Chan et al.), which equals
+    feeding the values one by one.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if n == 0:
+            return self
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        return self
+
+    @property
+    def var(self):
+        # sample variance (ddof=1), like pandas' .var()/.std()
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    def as_dict(self):
+        return {'count': self.count, 'mean': self.mean if self.count else np.nan, 'var': self.var,
+                'std': self.std, 'min': self.min if self.count else np.nan, 'max': self.max if self.count else np.nan}
+
+
+class _StripDollars(io.RawIOBase):
+    # file wrapper dropping '$' from every block read, so the csv parser sees plain numbers
+    def __init__(self, f):
+        self.f = f
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        while True:
+            block = self.f.read(len(buf))
+            data = block.replace(b'$', b'')
+            if data or not block:  # a block of only '$' signs is not the end of the file
+                break
+        buf[:len(data)] = data
+        return len(data)
+
+
+def _newest_first(first, dates):
+    # file order from the first date that differs from the file's first one (None while all equal);
+    # Nasdaq exports list the newest day first
+    other = dates[dates != first]
+    return None if other.empty else bool(other.iloc[0] < first)
+
+
+def stream_percent_change(path=DATA_PATH, chunksize=1_000_000, column='Close/Last', newest_first=None):
+    """
+    RunningStats of the daily percent change of `column`, reading `chunksize` rows at a time.
+
+    Each change needs the neighbouring row, so the last price of every chunk is carried into the
+    next one and the change across the boundary is counted exactly once. Changes always run from
+    the older to the newer row: newest_first=None detects the file order from its dates (rows
+    on one date are taken in file order), holding back at most one chunk until it is known.
+    Rows without a price are skipped (the next change spans the gap).
+    """
+    stats = RunningStats()
+    carry = np.empty(0)  # last price of the previous chunk (all prices so far while the order is unknown)
+    first = None
+    with open(path, 'rb') as raw:
+        reader = pd.read_csv(io.BufferedReader(_StripDollars(raw), buffer_size=1 << 20), usecols=['Date', column],
+                             thousands=',', dtype={column: np.float64}, chunksize=chunksize)
+        for chunk in reader:
+            if newest_first is None:
+                dates = pd.to_datetime(chunk['Date'])
+                first = dates.iloc[0] if first is None else first
+                newest_first = _newest_first(first, dates)
+            prices = chunk[column].to_numpy()
+            prices = np.concatenate((carry, prices[~np.isnan(prices)]))
+            if newest_first is None and len(prices) <= chunksize or len(prices) < 2:
+                carry = prices
+                continue
+            newest_first = bool(newest_first)  # still one date after a full chunk: take the file order
+            earlier, later = (prices[1:], prices[:-1]) if newest_first else (prices[:-1], prices[1:])
+            stats.update((later - earlier) / earlier * 100)
+            carry = prices[-1:]
+    if newest_first is None and len(carry) > 1:
+        stats.update(np.diff(carry) / carry[:-1] * 100)  # short file on a single date: file order
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Daily percent change statistics of a price CSV, read in chunks.')
+    ap.add_argument('path', nargs='?', default=DATA_PATH)
+    ap.add_argument('--chunksize', type=int, default=1_000_000, help='Rows per chunk')
+    ap.add_argument('--column', default='Close/Last')
+    args = ap.parse_args()
+
+    stats = stream_percent_change(args.path, args.chunksize, args.column).as_dict()
+    print(f"{stats['count']} daily changes: mean {stats['mean']:.4f}%, std {stats['std']:.4f}%, "
+          f"min {stats['min']:.4f}%, max {stats['max']:.4f}%")
+
+
+if __name__ == '__main__':
+    main()
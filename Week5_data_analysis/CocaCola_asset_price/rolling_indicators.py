@@ -0,0 +1,86 @@
+# Rolling indicators (moving average, volatility, drawdown, z-score) for a price series, in one pass per window
+import numpy as np
+import pandas as pd
+
+from cocacola_asset_price import chronological
+
+
+def _window_sums(x, w):
+    # sums of x over every full window of length w ending at i (NaN before the first), from one cumsum
+    cs = np.concatenate(([0.0], np.cumsum(x)))
+    out = np.full(len(x), np.nan)
+    out[w - 1:] = cs[w:] - cs[:-w]
+    return out
+
+
+def rolling_mean_std(x, w):
+    """
+    Mean and sample std (ddof=1) of every full window of length w, from cumulative sums of x and
+    x**2. x is centred on its overall mean first so the sums stay small and the variance does
+    not lose digits to cancellation.
+    """
+    x = np.asarray(x, dtype=float)
+    centred = x - x.mean() if len(x) else x
+    s1 = _window_sums(centred, w)
+    s2 = _window_sums(centred ** 2, w)
+    mean = s1 / w + (x.mean() if len(x) else 0.0)
+    var = np.maximum(s2 - s1 ** 2 / w, 0.0) / (w - 1) if w > 1 else np.full(len(x), np.nan)
+    return mean, np.sqrt(var)
+
+
+def rolling_max(x, w):
+    """
+    Max over the last w values (fewer at the start) for every position, O(1) per element.
+    Blocks of w values get prefix and suffix running maxima (van Herk / Gil-Werman); a window
+    covers the tail of one block and the head of the next, so its max is the larger of the
+    two. This gives what a monotonic deque would, without a Python loop per row.
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    out = np.maximum.accumulate(x) if n else x.copy()  # partial windows at the start
+    if w > n:
+        return out
+    pad = -n % w
+    blocks = np.concatenate((x, np.full(pad, -np.inf))).reshape(-1, w)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()[:n]
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+    out[w - 1:] = np.maximum(suffix[:n - w + 1], prefix[w - 1:])
+    return out
+
+
+def rolling_min(x, w):
+    return -rolling_max(-np.asarray(x, dtype=float), w)
+
+
+def rolling_indicators(df, windows=(20, 60), column='Close/Last'):
+    """
+    One table of rolling indicators for a price table, oldest day first.
+
+    Rows are put in date order first (the Nasdaq export lists the newest day first) and rows
+    without a price dropped. Per window w:
+      'MA w'          moving average of the price
+      'Volatility w'  std of the daily percent change over the last w changes
+      'Z-score w'     (price - MA w) / std of the price over the window
+      'Drawdown w'    worst fall from the highest price of the previous w days, over the last w days (%)
+    Windows are full-length only (NaN before). Each indicator is one cumulative-sum or running-max
+    pass, independent of w. The 'Date', 'Close/Last' and 'Percent Change' columns keep the names
+    the plotting functions use, so the table can be passed to them directly.
+    """
+    df = chronological(df).dropna(subset=[column])
+    close = df[column].to_numpy(dtype=float)
+    change = np.full(len(close), np.nan)
+    change[1:] = np.diff(close) / close[:-1] * 100
+
+    columns = {'Date': df['Date'].to_numpy(), column: close, 'Percent Change': change}
+    for w in windows:
+        if w < 2:
+            raise ValueError(f'window must be at least 2 days, got {w}')
+        ma, sd = rolling_mean_std(close, w)
+        vol = np.full(len(close), np.nan)
+        vol[1:] = rolling_mean_std(change[1:], w)[1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = (close - ma) / sd
+        drawdown = rolling_min(close / rolling_max(close, w) - 1, w) * 100
+        drawdown[:w - 1] = np.nan
+        columns.update({f'MA {w}': ma, f'Volatility {w}': vol, f'Z-score {w}': z, f'Drawdown {w}': drawdown})
+    return pd.DataFrame(columns)
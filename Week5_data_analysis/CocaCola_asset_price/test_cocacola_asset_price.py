@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import cocacola_asset_price as prices
+
+SAMPLE = """Date,Close/Last,Volume,Open,High,Low
+10/17/2025,$68.44,15541770,$68.00,$68.495,$67.80
+10/16/2025,"$1,067.59",15707230,$67.175,$68.105,$67.16
+10/15/2025,$67.08,11193720,$67.265,$67.72,$66.92
+"""
+
+
+class TestLoadPrices(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = os.path.join(self.tmp, 'prices.csv')
+        with open(self.path, 'w') as f:
+            f.write(SAMPLE)
+        prices._CACHE.clear()
+
+    def test_parses_once_and_reloads_on_change(self):
+        df = prices.load_prices(self.path)
+        self.assertEqual(df['Close/Last'].tolist(), [68.44, 1067.59, 67.08])
+        self.assertIs(prices.load_prices(self.path), df)  # memoised
+        with open(self.path, 'a') as f:
+            f.write('10/14/2025,$67.51,14245560,$66.87,$67.57,$66.745\n')
+        self.assertEqual(len(prices.load_prices(self.path)), 4)  # file changed, parsed again
+
+    def test_all_columns_numeric(self):
+        df = prices.parse_prices(self.path)
+        self.assertEqual(df['Volume'].dtype, np.int64)
+        self.assertEqual(df['Open'].tolist(), [68.0, 67.175, 67.265])
+        self.assertEqual(df['High'].tolist(), [68.495, 68.105, 67.72])
+        with open(self.path, 'a') as f:
+            f.write('10/14/2025,$67.51,N/A,$66.87,$67.57,$66.745\n')
+        volume = prices.parse_prices(self.path)['Volume']
+        self.assertEqual(str(volume.dtype), 'Int64')  # missing volume kept as <NA>
+        self.assertTrue(volume.isna().iloc[-1])
+
+    def test_sidecar_roundtrip(self):
+        first = prices.load_prices(self.path, sidecar=True)
+        self.assertTrue(os.path.exists(self.path + '.npz'))
+        prices._CACHE.clear()
+        again = prices.load_prices(self.path, sidecar=True)
+        self.assertEqual(again['Close/Last'].tolist(), first['Close/Last'].tolist())
+        self.assertEqual(again['Date'].tolist(), first['Date'].tolist())
+        self.assertEqual(again['Volume'].tolist(), first['Volume'].tolist())
+
+    def test_percent_change_leaves_cached_table_alone(self):
+        df = prices.load_prices(self.path)
+        columns = list(df.columns)
+        with mock.patch.object(prices.plt, 'savefig'), mock.patch.object(prices.plt, 'show'):
+            prices.plot_cocacola_percent_change(df)
+        prices.plt.close('all')
+        prices.calculate_std_dev_percent_change(df)  # works without the plot having run first
+        self.assertEqual(list(prices.load_prices(self.path).columns), columns)
+        np.testing.assert_allclose(prices.percent_change(df).iloc[1:], [(1067.59 / 68.44 - 1) * 100, (67.08 / 1067.59 - 1) * 100])
+
+    def test_df_is_lazy(self):
+        self.assertNotIn('df', vars(prices))  # nothing parsed at import
+        with self.assertRaises(AttributeError):
+            prices.not_a_column
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from price_stream import RunningStats, stream_percent_change
+
+
+class TestPriceStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        rng = np.random.default_rng(1)
+        self.prices = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, 50)))  # oldest first, some above $1,000
+        dates = pd.bdate_range('2025-01-01', periods=50).strftime('%m/%d/%Y')
+        self.path = os.path.join(self.tmp, 'prices.csv')
+        with open(self.path, 'w') as f:
+            f.write('Date,Close/Last,Volume,Open,High,Low\n')
+            for d, p in zip(dates[::-1], self.prices[::-1]):  # newest first, like the Nasdaq export
+                f.write(f'{d},"${p:,.4f}",100,$1,$1,$1\n')
+        self.expected = pd.Series(np.round(self.prices, 4)).pct_change() * 100
+
+    def test_matches_pandas_for_any_chunk_size(self):
+        for chunksize in (1, 2, 7, 49, 1000):
+            stats = stream_percent_change(self.path, chunksize=chunksize)
+            self.assertEqual(stats.count, 49)
+            self.assertAlmostEqual(stats.mean, self.expected.mean())
+            self.assertAlmostEqual(stats.std, self.expected.std())
+            self.assertAlmostEqual(stats.min, self.expected.min())
+            self.assertAlmostEqual(stats.max, self.expected.max())
+
+    def test_running_stats_merge_equals_one_pass(self):
+        values = np.random.default_rng(2).normal(5, 3, 1000)
+        stats = RunningStats()
+        for part in np.array_split(values, 13):
+            stats.update(part)
+        self.assertAlmostEqual(stats.var, values.var(ddof=1))
+        self.assertTrue(np.isnan(RunningStats().update([np.nan]).as_dict()['mean']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+import pandas as pd
+from rolling_indicators import rolling_indicators, rolling_max
+
+
+class TestRollingIndicators(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.close = pd.Series(50 + rng.normal(size=120).cumsum())
+        dates = pd.bdate_range('2025-01-01', periods=120).strftime('%m/%d/%Y')
+        # newest first, as in the Nasdaq export
+        self.df = pd.DataFrame({'Date': dates[::-1], 'Close/Last': self.close[::-1].to_numpy()})
+
+    def test_matches_pandas_rolling(self):
+        w = 10
+        table = rolling_indicators(self.df, windows=(w,))
+        c = self.close
+        self.assertTrue(table['Date'].is_monotonic_increasing)
+        np.testing.assert_allclose(table['Close/Last'], c)
+        np.testing.assert_allclose(table[f'MA {w}'], c.rolling(w).mean())
+        np.testing.assert_allclose(table[f'Volatility {w}'], (c.pct_change() * 100).rolling(w).std())
+        np.testing.assert_allclose(table[f'Z-score {w}'], (c - c.rolling(w).mean()) / c.rolling(w).std())
+        drawdown = (c / c.rolling(w, min_periods=1).max() - 1).rolling(w, min_periods=1).min() * 100
+        drawdown[:w - 1] = np.nan
+        np.testing.assert_allclose(table[f'Drawdown {w}'], drawdown)
+
+    def test_rolling_max_any_window(self):
+        x = np.random.default_rng(4).normal(size=50)
+        for w in (1, 2, 7, 50, 80):
+            np.testing.assert_allclose(rolling_max(x, w), pd.Series(x).rolling(w, min_periods=1).max())
+        with self.assertRaises(ValueError):
+            rolling_indicators(self.df, windows=(1,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from ticker_batch import analyse_directory
+
+GOOD = """Date,Close/Last,Volume,Open,High,Low
+10/17/2025,$110.00,100,$1,$1,$1
+10/16/2025,$90.00,100,$1,$1,$1
+10/15/2025,$100.00,100,$1,$1,$1
+"""
+
+
+class TestTickerBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.src = os.path.join(self.tmp, 'prices')
+        os.makedirs(self.src)
+        files = {'ko.csv': GOOD, 'empty.csv': '', 'bad.csv': 'Date,Price\n10/17/2025,abc\n',
+                 'short.csv': GOOD.splitlines()[0] + '\n' + GOOD.splitlines()[1] + '\n'}
+        for name, text in files.items():
+            with open(os.path.join(self.src, name), 'w') as f:
+                f.write(text)
+
+    def test_summary_with_malformed_files(self):
+        out = os.path.join(self.tmp, 'report')
+        summary = analyse_directory(self.src, out, workers=1)
+        self.assertEqual(summary['ticker'].tolist(), ['BAD', 'EMPTY', 'KO', 'SHORT'])
+        ko = summary.set_index('ticker').loc['KO']
+        self.assertEqual(ko['status'], 'ok')
+        self.assertEqual(ko['first_date'], '2025-10-15')  # rows put in date order
+        self.assertAlmostEqual(ko['total_return'], 10.0)
+        self.assertAlmostEqual(ko['max_drawdown'], -10.0)
+        self.assertTrue(os.path.exists(ko['chart']))
+        self.assertTrue(all(s.startswith('error') for s in summary['status'] if s != 'ok'))
+        self.assertEqual(len(pd.read_csv(os.path.join(out, 'summary.csv'))), 4)
+
+    def test_process_pool_matches_in_process(self):
+        a = analyse_directory(self.src, os.path.join(self.tmp, 'a'), workers=1, charts=False)
+        b = analyse_directory(self.src, os.path.join(self.tmp, 'b'), workers=2, charts=False)
+        pd.testing.assert_frame_equal(a, b)
+
+    def test_duplicate_tickers_reported(self):
+        # ko.csv and ko.txt both name KO; neither is analysed or charted
+        with open(os.path.join(self.src, 'ko.txt'), 'w') as f:
+            f.write(GOOD)
+        out = os.path.join(self.tmp, 'report')
+        summary = analyse_directory(self.src, out, workers=1, pattern='*')
+        ko = summary[summary['ticker'] == 'KO']
+        self.assertEqual(len(ko), 2)
+        self.assertTrue(all(s.startswith('error: duplicate ticker') for s in ko['status']))
+        self.assertIn('ko.csv', ko['status'].iloc[0])
+        self.assertIn('ko.txt', ko['status'].iloc[1])
+        self.assertFalse(os.path.exists(os.path.join(out, 'charts', 'KO.png')))
+        self.assertEqual(summary.set_index('ticker').loc['SHORT', 'status'][:5], 'error')
+
+
+if __name__ == '__main__':
+    unittest.main()
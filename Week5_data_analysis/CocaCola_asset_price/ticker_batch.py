@@ -0,0 +1,139 @@
+# Batch price analysis: returns, volatility and charts for every Nasdaq-style CSV in a directory
+#
+#   python ticker_batch.py prices/ --outdir ticker_report --workers 8
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')  # workers only write files
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from cocacola_asset_price import parse_prices, chronological
+
+TRADING_DAYS = 252
+SUMMARY_COLUMNS = ['ticker', 'status', 'rows', 'first_date', 'last_date', 'last_close', 'total_return',
+                   'mean_daily_change', 'daily_volatility', 'annual_volatility', 'max_drawdown', 'chart']
+
+
+def ticker_stats(df):
+    """
+    Summary of one chronological price table (percentages): total return, mean and std of the
+    daily percent change, the std annualised over 252 trading days, and the worst peak-to-trough
+    drawdown of the closing price.
+    """
+    close = df['Close/Last'].to_numpy(dtype=float)
+    change = np.diff(close) / close[:-1] * 100
+    drawdown = close / np.maximum.accumulate(close) - 1
+    daily_vol = change.std(ddof=1) if len(change) > 1 else np.nan
+    return {
+        'rows': len(df),
+        'first_date': df['Date'].iloc[0].date().isoformat(),
+        'last_date': df['Date'].iloc[-1].date().isoformat(),
+        'last_close': close[-1],
+        'total_return': (close[-1] / close[0] - 1) * 100,
+        'mean_daily_change': change.mean(),
+        'daily_volatility': daily_vol,
+        'annual_volatility': daily_vol * np.sqrt(TRADING_DAYS),
+        'max_drawdown': drawdown.min() * 100,
+    }
+
+
+def plot_ticker(df, ticker, outpath):
+    # closing price and daily percent change, one figure per ticker
+    fig, (top, bottom) = plt.subplots(2, 1, figsize=(10, 6), sharex=True)
+    top.plot(df['Date'], df['Close/Last'], label=f'{ticker} Closing Price')
+    top.set_ylabel('Closing Price')
+    top.set_title(f'{ticker} Asset Closing Price and Daily Percent Change')
+    top.legend()
+    bottom.plot(df['Date'], df['Close/Last'].pct_change() * 100, color='orange', label=f'{ticker} Percent Change')
+    bottom.set_xlabel('Date')
+    bottom.set_ylabel('Percent Change (%)')
+    bottom.legend()
+    fig.savefig(outpath)
+    plt.close(fig)
+
+
+def ticker_name(path):
+    # ko.csv, KO.csv and ko.txt all name ticker KO
+    return Path(path).stem.upper()
+
+
+def analyse_ticker(path, chart_dir=None):
+    # one summary row; a malformed file becomes a row with status 'error: ...' instead of stopping the batch
+    ticker = ticker_name(path)
+    row = {'ticker': ticker}
+    try:
+        df = chronological(parse_prices(path))
+        if 'Close/Last' not in df.columns:
+            raise ValueError('no Close/Last column')
+        df = df.dropna(subset=['Close/Last'])
+        if len(df) < 2:
+            raise ValueError('fewer than two prices')
+        row.update(ticker_stats(df))
+        if chart_dir is not None:
+            row['chart'] = os.path.join(chart_dir, f'{ticker}.png')
+            plot_ticker(df, ticker, row['chart'])
+        row['status'] = 'ok'
+    except Exception as e:  # deliberately broad: any bad file becomes an error row, the batch carries on
+        row['status'] = f'error: {type(e).__name__}: {e}'
+    return row
+
+
+def _analyse(task):
+    return analyse_ticker(*task)
+
+
+def analyse_directory(directory, outdir, workers=None, pattern='*.csv', charts=True):
+    """
+    Analyse every file matching pattern in directory in a process pool and write
+    '<outdir>/summary.csv' (one row per ticker, sorted by ticker; failed files keep their
+    error in 'status'). Charts go to '<outdir>/charts'. workers=1 runs in this process.
+    Files that name the same ticker (e.g. ko.csv and KO.csv) would overwrite one chart, so none
+    of them is analysed; each gets an error row listing the clashing files.
+    """
+    files = sorted(Path(directory).glob(pattern))
+    chart_dir = os.path.join(outdir, 'charts') if charts else None
+    os.makedirs(chart_dir or outdir, exist_ok=True)
+    by_ticker = {}
+    for f in files:
+        by_ticker.setdefault(ticker_name(f), []).append(f.name)
+    duplicates = [{'ticker': ticker, 'status': f"error: duplicate ticker: {name} (files {', '.join(names)})"}
+                  for ticker, names in by_ticker.items() if len(names) > 1 for name in names]
+    tasks = [(str(f), chart_dir) for f in files if len(by_ticker[ticker_name(f)]) == 1]
+
+    if workers == 1:
+        rows = list(map(_analyse, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # several files per task so hundreds of small CSVs don't pay one round trip each
+            chunk = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+            rows = list(pool.map(_analyse, tasks, chunksize=chunk))
+
+    summary = pd.DataFrame(rows + duplicates, columns=SUMMARY_COLUMNS)
+    summary = summary.sort_values('ticker', kind='stable').reset_index(drop=True)
+    summary.to_csv(os.path.join(outdir, 'summary.csv'), index=False)
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Returns, volatility and charts for every ticker CSV in a directory.')
+    ap.add_argument('directory', help='Directory of Nasdaq-style price CSVs (one ticker per file)')
+    ap.add_argument('--outdir', default='ticker_report', help='Where summary.csv and charts/ are written')
+    ap.add_argument('--pattern', default='*.csv')
+    ap.add_argument('--workers', type=int, default=None)
+    ap.add_argument('--no-charts', action='store_true', help='Only write the summary table')
+    args = ap.parse_args()
+
+    summary = analyse_directory(args.directory, args.outdir, args.workers, args.pattern, not args.no_charts)
+    failed = summary[summary['status'] != 'ok']
+    print(f"{len(summary) - len(failed)} tickers analysed, {len(failed)} failed -> {os.path.join(args.outdir, 'summary.csv')}")
+    for ticker, status in zip(failed['ticker'], failed['status']):
+        print(f'  {ticker}: {status}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,102 @@
+import io
+import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
 
-#cleaning cocacola data
-df = pd.read_csv('cocacola_data.csv')
-df = df.drop(['Volume', 'Open', 'High', 'Low'], axis=1)  # remove unnecessary columns
-# converting 'Close/Last' to remove $ sign and convert to float
-df['Close/Last'] = df['Close/Last'].replace('[\$,]', '', regex=True).astype(float)
+DATA_PATH = 'cocacola_data.csv'
+_CACHE = {}  # absolute csv path -> ((mtime_ns, size), cleaned DataFrame)
 
-#plotting closing price against date
-def plot_cocacola_data():
+
+PRICE_COLUMNS = ['Close/Last', 'Open', 'High', 'Low']
+
+
+#cleaning cocacola data: every OHLC column as float, Volume as int64
+def parse_prices(path):
+    """
+    Parse a Nasdaq-style export ("$68.44", quoted "$1,067.59"). The '$' signs are stripped from
+    the raw bytes in one pass and the C parser reads the numbers directly with ',' as the
+    thousands separator, so no string is cleaned cell by cell.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read().replace(b'$', b'')
+    df = pd.read_csv(io.BytesIO(raw), thousands=',')
+    df.columns = df.columns.str.strip()
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float64)
+    if 'Volume' in df.columns:
+        # int64 unless some rows have no volume (e.g. "N/A"), then the nullable Int64
+        volume = pd.to_numeric(df['Volume'], errors='coerce')
+        df['Volume'] = volume.astype(np.int64) if volume.notna().all() else volume.astype('Int64')
+    return df
+
+
+def _sidecar_path(path):
+    return path + '.npz'
+
+
+def _read_sidecar(path, stamp):
+    # cleaned columns saved by an earlier run; only valid for the same csv mtime and size
+    try:
+        with np.load(_sidecar_path(path)) as f:
+            if tuple(f['__stamp__']) != stamp:
+                return None
+            return pd.DataFrame({str(col): f[col] for col in f['__columns__']})
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _write_sidecar(path, stamp, df):
+    if any(str(dtype) == 'Int64' for dtype in df.dtypes):
+        return  # a Volume with gaps has no plain numpy form; parse the text next time instead
+    tmp = f'{_sidecar_path(path)}.{os.getpid()}.tmp.npz'
+    columns = {col: df[col].to_numpy() if pd.api.types.is_numeric_dtype(df[col]) else df[col].to_numpy(dtype=str)
+               for col in df.columns}
+    np.savez(tmp, __stamp__=np.array(stamp, dtype=np.int64), __columns__=np.array(list(df.columns)), **columns)
+    os.replace(tmp, _sidecar_path(path))  # atomic, readers never see half a file
+
+
+def load_prices(path=DATA_PATH, sidecar=False):
+    """
+    Cleaned price table, parsed on first use and memoised per path and file mtime/size,
+    so repeated calls (and `from cocacola_asset_price import df`) cost nothing after the first.
+    With sidecar=True the cleaned columns are also kept in '<csv>.npz' and later runs load
+    that binary file instead of parsing the text again (rebuilt when the csv changes).
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _CACHE.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    df = _read_sidecar(path, stamp) if sidecar else None
+    if df is None:
+        df = parse_prices(path)
+        if sidecar:
+            _write_sidecar(path, stamp, df)
+    _CACHE[path] = (stamp, df)
+    return df
+
+
+def chronological(df):
+    # Nasdaq exports list the newest day first; returns need oldest-first rows with parsed dates
+    out = df.assign(Date=pd.to_datetime(df['Date'], format='%m/%d/%Y'))
+    if not out['Date'].is_monotonic_increasing:
+        out = out.sort_values('Date', kind='stable')
+    return out.reset_index(drop=True)
+
+
+def __getattr__(name):
+    # module-level `df` is loaded lazily on first access (PEP 562), not at import
+    if name == 'df':
+        return load_prices()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+#plotting closing price against date (df: any table with Date and Close/Last, e.g. rolling_indicators output)
+def plot_cocacola_data(df=None):
+    df = load_prices() if df is None else df
     plt.plot(pd.to_datetime(df['Date']), df['Close/Last'], label='CocaCola Closing Price')
     plt.xlabel('Date')
     plt.ylabel('Closing Price')
@@ -20,10 +106,17 @@ def plot_cocacola_data():
     plt.savefig("cocacola_closing_price.png")
     plt.show()
 
+#percent change of df, its own 'Percent Change' column if it has one; computed on the side so the
+#memoised table from load_prices is never modified
+def percent_change(df):
+    if 'Percent Change' in df.columns:
+        return df['Percent Change']
+    return df['Close/Last'].pct_change() * 100  #calculate percent change
+
 #plotting percent change against date
-def plot_cocacola_percent_change():
-    df['Percent Change'] = df['Close/Last'].pct_change() * 100  #calculate percent change
-    plt.plot(pd.to_datetime(df['Date']), df['Percent Change'], label='CocaCola Percent Change', color='orange')
+def plot_cocacola_percent_change(df=None):
+    df = load_prices() if df is None else df
+    plt.plot(pd.to_datetime(df['Date']), percent_change(df), label='CocaCola Percent Change', color='orange')
     plt.xlabel('Date')
     plt.ylabel('Percent Change (%)')
     plt.title('CocaCola Asset Percent Change Over Time')
@@ -33,8 +126,9 @@ def plot_cocacola_percent_change():
     plt.show()
 
 #calculating standard deviation of percent daily changes
-def calculate_std_dev_percent_change():
-    std_dev = df['Percent Change'].std()
+def calculate_std_dev_percent_change(df=None):
+    df = load_prices() if df is None else df
+    std_dev = percent_change(df).std()
     print(f"Standard Deviation of Daily Percent Changes: {std_dev:.2f}%")
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
-from cocacola_asset_price import df
+import argparse
+
+import cocacola_asset_price as prices  # the price table is loaded on first use, not at import
+import sort_benchmark as bench
 import pandas as pd
 import numpy as np
 import time
@@ -8,52 +11,70 @@ import matplotlib.pyplot as plt
 #Hypothesis: The measured sorting time for T(n) should scale approximately as n log n
 
 #Results: The measures sorting time T(n) does scale approximately as n log n, confirming the hypothesis.
-#Minor deviations at small n arise from timing resolution and system noise
+#Minor deviations at small n arise from timing resolution and system noise; the benchmark harness
+#now repeats every timing (median and IQR) and scales n up to 10^7 so the exponent can be fitted
 
 #sorting closing prices and measuring time taken
 def sort_cocacola_prices():
-    prices = df['Close/Last'].tolist()  # get closing prices as list
+    closing = prices.load_prices()['Close/Last'].tolist()  # get closing prices as list
 
-    start_time = time.time()
-    sorted_prices = sorted(prices)  # sort prices in ascending order
-    end_time = time.time()
+    start_time = time.perf_counter_ns()
+    sorted_prices = sorted(closing)  # sort prices in ascending order
+    end_time = time.perf_counter_ns()
 
-    time_taken = end_time - start_time
+    time_taken = (end_time - start_time) / 1e9
     print(f"Time taken to sort closing prices: {time_taken:.6f} seconds")
     return sorted_prices
 
 
-# For n = 7->365, time how long it takes to sort the first n daily changes
-def time_sort_daily_changes():
-    prices = df['Close/Last'].values
+# Sorting time T(n) of n daily changes, resampled from the observed ones so n can go up to 10^7,
+# for sorted(), the np.sort kinds and a radix sort (see sort_benchmark.py for the harness)
+def time_sort_daily_changes(max_n=10**7, methods=tuple(bench.METHODS), repeats=7, out='sort_benchmark.json'):
+    closing = prices.chronological(prices.load_prices())['Close/Last'].to_numpy()
     # daily change P_{n+1} - P_n
-    daily_changes = prices[1:] - prices[:-1]
-    max_n = min(365, len(daily_changes))
-    n_values = np.arange(7, max_n + 1)
-    times = []
-    for n in n_values:
-        subset = daily_changes[:n].tolist()
-        start = time.time()
-        _ = sorted(subset)
-        end = time.time()
-        times.append(end - start)
-    # Plot T vs n and scaled n log n for comparison
+    daily_changes = closing[1:] - closing[:-1]
+    rows = bench.benchmark(daily_changes, bench.n_grid(10, max_n), methods, repeats)
+    fits = bench.fit_exponent(rows)
+    bench.save_results(out, rows, fits, {'max_n': max_n, 'methods': list(methods), 'repeats': repeats})
+    # Plot median T vs n with the interquartile range, log-log so the slope is the exponent
     plt.figure()
-    plt.plot(n_values, times, marker='o', label='Measured T(n)')
-    nlogn = n_values * np.log(n_values)
-    # scale nlogn to match the scale of measured times for easier visual comparison
-    scale = times[0] / (nlogn[0])
-    plt.plot(n_values, scale * nlogn, '--', label=r'scaled $n \log n$')
+    for name in methods:
+        sel = [r for r in rows if r['method'] == name]
+        n_values = np.array([r['n'] for r in sel])
+        median = np.array([r['median_ns'] for r in sel]) / 1e9
+        spread = np.array([[r['median_ns'] - r['q1_ns'], r['q3_ns'] - r['median_ns']] for r in sel]).T / 1e9
+        label = f"{name} (n^{fits[name]['exponent']:.2f})" if name in fits else name
+        plt.errorbar(n_values, median, yerr=spread, marker='o', markersize=3, capsize=2, label=label)
+    nlogn = np.array(bench.n_grid(10, max_n), dtype=float)
+    # n log n through the fastest method's time at the largest n, for comparison of the slope
+    last = min((r for r in rows if r['n'] == rows[-1]['n']), key=lambda r: r['median_ns'])
+    plt.plot(nlogn, last['median_ns'] / 1e9 * nlogn * np.log(nlogn) / (last['n'] * np.log(last['n'])), 'k--',
+             label=r'$n \log n$')
+    plt.xscale('log')
+    plt.yscale('log')
     plt.xlabel('n (number of daily changes)')
-    plt.ylabel('Time to sort (seconds)')
+    plt.ylabel('Time to sort (seconds, median and IQR)')
     plt.title('Sorting time of daily price changes vs n')
-    plt.legend()
-    plt.grid(True)
+    plt.legend(fontsize=8)
+    plt.grid(True, which='both', alpha=0.3)
     plt.savefig('sort_time_vs_n.png')
     plt.show()
+    return rows, fits
+
+def main():
+    # the script default stops at n = 10^5 (seconds); pass --max-n 1e7 for the full curve (minutes)
+    ap = argparse.ArgumentParser(description='Sort the closing prices and time sorting daily changes against n.')
+    ap.add_argument('--max-n', type=float, default=1e5, help='Largest number of daily changes to sort')
+    ap.add_argument('--methods', nargs='+', default=list(bench.METHODS), choices=list(bench.METHODS))
+    ap.add_argument('--repeats', type=int, default=7)
+    ap.add_argument('--out', default='sort_benchmark.json')
+    args = ap.parse_args()
 
-if __name__ == "__main__":
     sorted_prices = sort_cocacola_prices()
     print("Sorted Closing Prices:")
     print(sorted_prices)
-    time_sort_daily_changes()
+    time_sort_daily_changes(int(args.max_n), tuple(args.methods), args.repeats, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# Sorting benchmark: sorted(), np.sort kinds and a float radix sort on resampled daily price changes
+#
+#   python sort_benchmark.py --max-n 10000000 --out sort_benchmark.json
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+import cocacola_asset_price as prices
+
+SIGN = np.uint64(1 << 63)
+
+
+def radix_sort(a):
+    """
+    Ascending copy of a float64 array by LSD radix sort, four passes of 16 bits.
+
+    The floats are mapped to unsigned keys with the same order (negative numbers: all bits
+    flipped, others: sign bit set). Each pass is a stable sort on one 16-bit digit, which numpy
+    does as a counting sort, so the whole sort is O(n) with no comparisons. NaNs go last.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    nan = np.isnan(a)
+    bits = a[~nan].view(np.uint64) if nan.any() else a.view(np.uint64)
+    keys = np.where(bits & SIGN, ~bits, bits | SIGN)
+    for shift in range(0, 64, 16):
+        digit = ((keys >> np.uint64(shift)) & np.uint64(0xFFFF)).astype(np.uint16)
+        if digit.min(initial=0) == digit.max(initial=0):
+            continue  # every key has the same digit here (e.g. the exponent bits), pass is a no-op
+        keys = keys[np.argsort(digit, kind='stable')]
+    out = np.where(keys & SIGN, keys ^ SIGN, ~keys).view(np.float64)
+    return np.concatenate((out, a[nan])) if nan.any() else out
+
+
+# name -> (prepare input once, sort it); preparation (e.g. list conversion) is not timed
+METHODS = {
+    'sorted': (lambda a: a.tolist(), sorted),
+    'np.quicksort': (lambda a: a, lambda a: np.sort(a, kind='quicksort')),
+    'np.mergesort': (lambda a: a, lambda a: np.sort(a, kind='mergesort')),
+    'np.heapsort': (lambda a: a, lambda a: np.sort(a, kind='heapsort')),
+    'np.stable': (lambda a: a, lambda a: np.sort(a, kind='stable')),
+    'radix': (lambda a: a, radix_sort),
+}
+
+
+def resample(changes, n, rng):
+    # n daily changes drawn with replacement from the observed ones (same distribution, any n)
+    return rng.choice(np.asarray(changes, dtype=np.float64), size=n, replace=True)
+
+
+def n_grid(min_n=10, max_n=10 ** 7, per_decade=4):
+    # log-spaced sizes, min_n and max_n included
+    n = np.logspace(np.log10(min_n), np.log10(max_n), int(round(per_decade * np.log10(max_n / min_n))) + 1)
+    return sorted(set(int(round(x)) for x in n))
+
+
+def time_call(fn, arg, repeats=7, warmup=1, min_time_ns=2_000_000):
+    """
+    Per-call times (ns) of fn(arg): `warmup` untimed calls, then `repeats` samples taken with
+    time.perf_counter_ns. A sample runs fn `number` times in a row, with number doubled until a
+    sample lasts at least min_time_ns, so fast calls are not lost in the timer resolution.
+    Returns (per-call times, number).
+    """
+    for _ in range(warmup):
+        fn(arg)
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn(arg)
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time_ns:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(repeats - 1):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn(arg)
+        samples.append((time.perf_counter_ns() - start) / number)
+    return np.array(samples), number
+
+
+def benchmark(changes, ns, methods=tuple(METHODS), repeats=7, warmup=1, min_time_ns=2_000_000,
+              max_call_s=5.0, seed=0):
+    """
+    Time every method on the same resampled input for every n; one row per (method, n) with
+    median, q1, q3 and iqr in ns per call. A method is not run at larger n once one of its calls
+    took longer than max_call_s (its later rows are missing, not NaN). Every result is checked
+    against np.sort.
+    """
+    rng = np.random.default_rng(seed)
+    rows, stopped = [], set()
+    for n in ns:
+        data = resample(changes, n, rng)
+        expected = np.sort(data)
+        for name in methods:
+            if name in stopped:
+                continue
+            prepare, sort = METHODS[name]
+            arg = prepare(data)
+            if not np.array_equal(np.asarray(sort(arg)), expected):
+                raise AssertionError(f'{name} returned a wrong order for n={n}')
+            samples, number = time_call(sort, arg, repeats, warmup, min_time_ns)
+            q1, median, q3 = np.percentile(samples, [25, 50, 75])
+            rows.append({'method': name, 'n': n, 'median_ns': median, 'q1_ns': q1, 'q3_ns': q3, 'iqr_ns': q3 - q1,
+                         'repeats': repeats, 'number': number})
+            if median > max_call_s * 1e9:
+                stopped.add(name)
+    return rows
+
+
+def fit_exponent(rows, min_n=1000):
+    """
+    Empirical complexity per method: least-squares fit of log T = log a + b log n over the rows
+    with n >= min_n (smaller n is dominated by call overhead). Returns
+    {method: {'exponent': b, 'coef_ns': a, 'r2': ..., 'points': ...}}; b is about 1 for n log n
+    sorts over this range (log n only adds ~0.1) and 1 for the radix sort.
+    """
+    fits = {}
+    for name in dict.fromkeys(r['method'] for r in rows):
+        pts = [(r['n'], r['median_ns']) for r in rows if r['method'] == name and r['n'] >= min_n]
+        if len(pts) < 2:
+            continue
+        x, y = np.log(np.array(pts, dtype=float)).T
+        b, log_a = np.polyfit(x, y, 1)
+        resid = y - (log_a + b * x)
+        r2 = 1 - resid @ resid / ((y - y.mean()) @ (y - y.mean())) if len(pts) > 2 else 1.0
+        fits[name] = {'exponent': float(b), 'coef_ns': float(np.exp(log_a)), 'r2': float(r2), 'points': len(pts)}
+    return fits
+
+
+def environment():
+    return {'python': sys.version.split()[0], 'numpy': np.__version__, 'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine()}
+
+
+def save_results(path, rows, fits, params):
+    # machine-readable: parameters, environment, one record per (method, n) and the fitted exponents
+    with open(path, 'w') as f:
+        json.dump({'params': params, 'environment': environment(), 'results': rows, 'fits': fits}, f, indent=1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark sorting methods on resampled daily price changes.')
+    ap.add_argument('--csv', default=prices.DATA_PATH, help='Price CSV the daily changes are drawn from')
+    ap.add_argument('--min-n', type=int, default=10)
+    ap.add_argument('--max-n', type=float, default=1e7)
+    ap.add_argument('--per-decade', type=int, default=4, help='Sizes per factor of 10 in n')
+    ap.add_argument('--methods', nargs='+', default=list(METHODS), choices=list(METHODS))
+    ap.add_argument('--repeats', type=int, default=7)
+    ap.add_argument('--warmup', type=int, default=1)
+    ap.add_argument('--max-call-s', type=float, default=5.0, help='Stop scaling a method once one call takes longer')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--out', default='sort_benchmark.json')
+    args = ap.parse_args()
+
+    closing = prices.chronological(prices.load_prices(args.csv))['Close/Last'].to_numpy()
+    params = {k: v for k, v in vars(args).items() if k != 'out'}
+    rows = benchmark(np.diff(closing), n_grid(args.min_n, int(args.max_n), args.per_decade), args.methods,
+                     args.repeats, args.warmup, max_call_s=args.max_call_s, seed=args.seed)
+    fits = fit_exponent(rows)
+    save_results(args.out, rows, fits, params)
+    for name, fit in fits.items():
+        print(f"{name:>13}: T(n) ~ n^{fit['exponent']:.2f}  (r2 {fit['r2']:.3f}, {fit['points']} sizes)")
+    print(f'{len(rows)} timings -> {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from sort_benchmark import radix_sort, benchmark, fit_exponent, n_grid, save_results, time_call
+
+
+class TestSortBenchmark(unittest.TestCase):
+    def test_radix_sort_matches_np_sort(self):
+        x = np.random.default_rng(0).normal(size=5000) * 10.0 ** np.random.default_rng(1).integers(-300, 300, 5000)
+        x[:4] = [-0.0, np.inf, -np.inf, 5e-324]
+        np.testing.assert_array_equal(radix_sort(x), np.sort(x))
+        self.assertTrue(np.isnan(radix_sort(np.array([np.nan, 1.0, -1.0]))[-1]))  # NaN last, like np.sort
+        self.assertEqual(len(radix_sort(np.array([]))), 0)
+
+    def test_grid_and_timer(self):
+        self.assertEqual(n_grid(10, 1000, 1), [10, 100, 1000])
+        samples, number = time_call(sum, [1.0] * 10, repeats=5, min_time_ns=100_000)
+        self.assertEqual(len(samples), 5)
+        self.assertGreater(number, 1)  # a ~1 us call is repeated until a sample is long enough to time
+
+    def test_rows_fits_and_json(self):
+        rows = benchmark(np.array([-1.0, 0.5, 2.0]), [1000, 4000, 16000], ['np.quicksort', 'radix'], repeats=3,
+                         min_time_ns=100_000)
+        self.assertEqual(len(rows), 6)
+        for row in rows:
+            self.assertLessEqual(row['q1_ns'], row['median_ns'])
+            self.assertLessEqual(row['median_ns'], row['q3_ns'])
+        fits = fit_exponent(rows)
+        self.assertEqual(set(fits), {'np.quicksort', 'radix'})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.json')
+            save_results(path, rows, fits, {'repeats': 3})
+            with open(path) as f:
+                saved = json.load(f)
+            self.assertEqual(len(saved['results']), 6)
+            self.assertIn('numpy', saved['environment'])
+
+
+if __name__ == '__main__':
+    unittest.main()
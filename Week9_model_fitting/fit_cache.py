@@ -0,0 +1,87 @@
+# On-disk cache of fitted models, keyed on the CSV contents and the fit parameters
+import hashlib
+import json
+import os
+import time
+
+DEFAULT_CACHE = '.fit_cache.json'
+
+
+def file_hash(path, chunk_size=1 << 20):
+    # sha256 of the raw file bytes
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def make_key(csv_hash, column, degree, max_fit_year):
+    return f'{csv_hash}|{column}|{degree}|{max_fit_year}'
+
+
+class FitCache:
+    """
+    Size-bounded LRU cache stored as a single JSON file.
+    Entries are keyed on a hash of the CSV bytes plus (column, degree, max_fit_year),
+    so a changed file never hits stale fits; entries for an older version of the
+    same file are dropped as soon as the new hash is seen.
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE, max_entries=256):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hashes = {}  # path -> [mtime_ns, size, sha256], avoids rehashing unchanged files
+        self.dirty = False  # in-memory changes (including recency from get) not yet saved
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path) as f:
+                    data = json.load(f)
+                self.entries = data.get('entries', {})
+                self.hashes = data.get('hashes', {})
+            except (OSError, ValueError):
+                # unreadable cache: start again rather than fail the run
+                self.entries, self.hashes = {}, {}
+
+    def csv_hash(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        known = self.hashes.get(path)
+        if known and known[0] == st.st_mtime_ns and known[1] == st.st_size:
+            return known[2]
+        digest = file_hash(path)
+        if known and known[2] != digest:
+            # file changed: invalidate everything computed from the old contents
+            self.entries = {k: v for k, v in self.entries.items() if not k.startswith(known[2] + '|')}
+        self.hashes[path] = [st.st_mtime_ns, st.st_size, digest]
+        return digest
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        entry['last_used'] = time.time()
+        self.dirty = True  # recency must reach the file too, or other processes evict by insertion time
+        return entry['value']
+
+    def put(self, key, value):
+        self.entries[key] = {'value': value, 'last_used': time.time()}
+        self.dirty = True
+        if len(self.entries) > self.max_entries:
+            # evict least recently used
+            oldest = sorted(self.entries, key=lambda k: self.entries[k]['last_used'])
+            for k in oldest[:len(self.entries) - self.max_entries]:
+                del self.entries[k]
+
+    def save(self):
+        tmp = f'{self.cache_path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'entries': self.entries, 'hashes': self.hashes}, f)
+        os.replace(tmp, self.cache_path)  # atomic, so concurrent readers never see half a file
+        self.dirty = False
+
+    def clear(self):
+        self.entries, self.hashes = {}, {}
+        if os.path.exists(self.cache_path):
+            os.remove(self.cache_path)
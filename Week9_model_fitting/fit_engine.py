@@ -0,0 +1,398 @@
+# Polynomial fit engine: fits every degree 1..N from a single QR factorisation
+import numpy as np
+import pandas as pd
+
+EPS = 1e-12
+
+
+def scale_years(x, center=None, scale=None):
+    # centre and scale years onto roughly [-1, 1] so high degrees stay well conditioned
+    x = np.asarray(x, dtype=float)
+    if center is None:
+        center = 0.5 * (x.min() + x.max())
+    if scale is None:
+        scale = 0.5 * (x.max() - x.min())
+        if scale == 0:
+            scale = 1.0
+    return (x - center) / scale, center, scale
+
+
+def design_matrix(t, max_degree):
+    # columns 1, t, t**2, ... t**max_degree
+    return np.vander(t, max_degree + 1, increasing=True)
+
+
+def fit_all_degrees(x, y, max_degree=9, sigma=None):
+    """
+    Fit polynomials of degree 1..max_degree to (x, y) in one pass.
+    Returns a dict with per-degree coefficients, residuals, RSS, chi-square,
+    reduced chi-square and BIC (same formulas as chi_square_testing).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 2:
+        raise ValueError('Need at least two points to fit')
+    max_degree = min(max_degree, n - 1)
+
+    t, center, scale = scale_years(x)
+    V = design_matrix(t, max_degree)
+    # the first d+1 columns of Q span the degree-d model, so one QR serves every degree
+    Q, R = np.linalg.qr(V)
+    qy = Q.T @ y
+
+    degrees = np.arange(1, max_degree + 1)
+    coeffs = {}
+    fitted = np.empty((n, max_degree))
+    for d in degrees:
+        k = d + 1
+        c = np.linalg.solve(R[:k, :k], qy[:k])  # increasing order in scaled t
+        coeffs[int(d)] = c[::-1]  # np.polyval order (highest power first)
+        fitted[:, d - 1] = Q[:, :k] @ qy[:k]
+    residuals = y[:, None] - fitted
+    rss = np.sum(residuals ** 2, axis=0)
+
+    # assuming constant uncertainty when none is given
+    if sigma is None:
+        sigma = np.std(y - np.mean(y))
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=float), y.shape)
+    chi_square = np.sum(residuals ** 2 / (sigma[:, None] ** 2), axis=0)
+    dof = n - (degrees + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        reduced_chi_square = np.where(dof > 0, chi_square / dof, np.nan)
+    bic = n * np.log(rss / n + EPS) + (degrees + 1) * np.log(n)
+
+    return {
+        'degrees': degrees,
+        'center': center,
+        'scale': scale,
+        'coeffs': coeffs,
+        'residuals': residuals,
+        'rss': rss,
+        'chi_square': chi_square,
+        'reduced_chi_square': reduced_chi_square,
+        'bic': bic,
+        'n': n,
+    }
+
+
+def iter_degree_fits(x, y, max_degree=20):
+    """
+    Lazily yield fitted models of degree 1, 2, ... max_degree.
+    Each degree adds one column to an orthogonal basis (Gram-Schmidt on the scaled
+    years), so stopping early never pays for the higher-degree fits.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 2:
+        raise ValueError('Need at least two points to fit')
+    t, center, scale = scale_years(x)
+
+    Q = np.empty((n, 0))
+    R = np.empty((0, 0))
+    qy = np.empty(0)
+    for p in range(min(max_degree, n - 1) + 1):
+        # orthogonalise t**p against the existing basis (twice, for stability)
+        v = t ** p
+        r = np.zeros(p + 1)
+        for _ in range(2):
+            h = Q.T @ v
+            v = v - Q @ h
+            r[:p] += h
+        r[p] = np.linalg.norm(v)
+        Q = np.column_stack([Q, v / r[p]])
+        R = np.pad(R, ((0, 1), (0, 1)))
+        R[:, p] = r
+        qy = np.append(qy, Q[:, p] @ y)
+        if p == 0:
+            continue
+
+        fitted = Q @ qy
+        residuals = y - fitted
+        rss = float(residuals @ residuals)
+        yield {
+            'degree': p,
+            'center': center,
+            'scale': scale,
+            'coeffs': np.linalg.solve(R, qy)[::-1],
+            'residuals': residuals,
+            'rss': rss,
+            'bic': n * np.log(rss / n + EPS) + (p + 1) * np.log(n),
+            'n': n,
+        }
+
+
+def select_model(x, y, max_degree=20, patience=2):
+    """
+    Pick the argmin-BIC polynomial degree, evaluating degrees lazily and stopping
+    once BIC has risen for `patience` consecutive degrees.
+    Returns (best_model, bics) where bics maps each evaluated degree to its BIC.
+    """
+    best = None
+    bics = {}
+    prev = None
+    rises = 0
+    for model in iter_degree_fits(x, y, max_degree):
+        bics[model['degree']] = model['bic']
+        if best is None or model['bic'] < best['bic']:
+            best = model
+        rises = rises + 1 if prev is not None and model['bic'] > prev else 0
+        prev = model['bic']
+        if rises >= patience:
+            break
+    return best, bics
+
+
+def model_from_fits(fits, degree):
+    # one degree of fit_all_degrees in the select_model / iter_degree_fits layout, without refitting
+    if degree not in fits['coeffs']:
+        raise ValueError(f'degree must be one of the fitted degrees {list(fits["coeffs"])}')
+    return {
+        'degree': degree,
+        'center': fits['center'],
+        'scale': fits['scale'],
+        'coeffs': fits['coeffs'][degree],
+        'residuals': fits['residuals'][:, degree - 1],
+        'rss': float(fits['rss'][degree - 1]),
+        'bic': float(fits['bic'][degree - 1]),
+        'n': fits['n'],
+    }
+
+
+def predict(model, years):
+    # evaluate a single model from iter_degree_fits / select_model at (unscaled) years
+    t = (np.asarray(years, dtype=float) - model['center']) / model['scale']
+    return np.polyval(model['coeffs'], t)
+
+
+def fit_all_series(x, Y, names=None, max_degree=9):
+    """
+    Fit degrees 1..max_degree to every column of Y, each with its own NaN mask.
+    Columns that share the same set of valid rows are solved together with one
+    QR factorisation and a multi-column right-hand side.
+    Returns a tidy DataFrame (one row per series x degree) with n, centre/scale,
+    RSS, reduced chi-square, BIC and coefficients c0..cN (increasing powers of
+    the scaled year, NaN above the fitted degree).
+    """
+    x = np.asarray(x, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    if names is None:
+        names = [f'series_{j}' for j in range(Y.shape[1])]
+    valid = ~np.isnan(Y) & ~np.isnan(x)[:, None]
+
+    # group columns by identical masks
+    groups = {}
+    for j in range(Y.shape[1]):
+        groups.setdefault(valid[:, j].tobytes(), []).append(j)
+
+    coef_cols = [f'c{p}' for p in range(max_degree + 1)]
+    rows = []
+    for cols in groups.values():
+        mask = valid[:, cols[0]]
+        n = int(mask.sum())
+        if n < 2:
+            continue
+        top = min(max_degree, n - 1)
+        t, center, scale = scale_years(x[mask])
+        Q, R = np.linalg.qr(design_matrix(t, top))
+        Yg = Y[mask][:, cols]
+        QY = Q.T @ Yg
+        sigma2 = np.var(Yg, axis=0)  # constant uncertainty, as in chi_square_testing
+        for d in range(1, top + 1):
+            k = d + 1
+            C = np.linalg.solve(R[:k, :k], QY[:k])
+            rss = np.sum((Yg - Q[:, :k] @ QY[:k]) ** 2, axis=0)
+            bic = n * np.log(rss / n + EPS) + k * np.log(n)
+            red_chi = rss / sigma2 / (n - k) if n > k else np.full(len(cols), np.nan)
+            for i, j in enumerate(cols):
+                coefs = np.full(max_degree + 1, np.nan)
+                coefs[:k] = C[:, i]
+                rows.append([names[j], d, n, center, scale, rss[i], red_chi[i], bic[i]] + list(coefs))
+
+    return pd.DataFrame(rows, columns=['series', 'degree', 'n', 'center', 'scale', 'rss',
+                                       'reduced_chi_square', 'bic'] + coef_cols)
+
+
+def evaluate(fits, degree, years):
+    # evaluate a fitted degree at (unscaled) years
+    t = (np.asarray(years, dtype=float) - fits['center']) / fits['scale']
+    return np.polyval(fits['coeffs'][degree], t)
+
+
+def residual_sigma(fits, degree):
+    # scalar observational sigma from the residuals of a given degree
+    return float(np.std(fits['residuals'][:, degree - 1]))
+
+
+def _update_r(R_aug, V_new, y_new):
+    # fold new rows into the triangular factor of [V y]; equivalent to adding
+    # V_new.T @ V_new to the normal equations but without squaring the condition number
+    if len(V_new) == 0:
+        return R_aug
+    stacked = np.vstack([R_aug, np.column_stack([V_new, y_new])])
+    return np.linalg.qr(stacked, mode='r')
+
+
+def _solve_degrees(R_aug, max_degree):
+    # coefficients (increasing order, zero padded) and RSS for every degree from one triangular factor;
+    # degrees with fewer rows than parameters are left as NaN
+    P = R_aug.shape[1] - 1
+    m = R_aug.shape[0]
+    z = R_aug[:, P]
+    C = np.full((max_degree, P), np.nan)
+    rss = np.full(max_degree, np.nan)
+    for d in range(1, min(max_degree, m - 1) + 1):
+        k = d + 1
+        C[d - 1, :] = 0.0
+        C[d - 1, :k] = np.linalg.solve(R_aug[:k, :k], z[:k])
+        rss[d - 1] = np.sum(z[k:] ** 2)
+    return C, rss
+
+
+def init_stats(x, y, max_degree=9):
+    """
+    Sufficient statistics for incremental fitting: the triangular factor R_aug of [V y]
+    (R_aug.T @ R_aug holds X^T X, X^T y and y^T y for every degree up to max_degree).
+    The year scaling is fixed here so later rows can be folded in without refitting.
+    """
+    x = np.asarray(x, dtype=float)
+    _, center, scale = scale_years(x)
+    state = {'center': center, 'scale': scale, 'max_degree': max_degree,
+             'R_aug': np.zeros((0, max_degree + 2)), 'n': 0, 'last_year': -np.inf}
+    return append_stats(state, x, y)
+
+
+def append_stats(state, x_new, y_new):
+    # fold new rows into the stored statistics in O(new rows); history is never revisited
+    x_new = np.asarray(x_new, dtype=float)
+    y_new = np.asarray(y_new, dtype=float)
+    if len(x_new) == 0:
+        return state
+    t = (x_new - state['center']) / state['scale']
+    V = design_matrix(t, state['max_degree'])
+    state['R_aug'] = _update_r(state['R_aug'], V, y_new)
+    state['n'] += len(x_new)
+    state['last_year'] = max(state['last_year'], float(x_new.max()))
+    return state
+
+
+def stats_fits(state):
+    # coefficients, RSS, reduced chi-square and BIC for every degree from the stored statistics,
+    # in the same layout as fit_all_degrees (without residuals)
+    n = state['n']
+    R_aug = state['R_aug']
+    C, rss = _solve_degrees(R_aug, min(state['max_degree'], n - 1))
+    degrees = np.arange(1, len(rss) + 1)
+    # total sum of squares about the mean = RSS of the constant model
+    sigma2 = np.sum(R_aug[1:, -1] ** 2) / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        reduced_chi_square = np.where(n > degrees + 1, rss / sigma2 / (n - degrees - 1), np.nan)
+    return {
+        'degrees': degrees,
+        'center': state['center'],
+        'scale': state['scale'],
+        'coeffs': {int(d): C[d - 1, :d + 1][::-1] for d in degrees},
+        'rss': rss,
+        'reduced_chi_square': reduced_chi_square,
+        'bic': n * np.log(rss / n + EPS) + (degrees + 1) * np.log(n),
+        'n': n,
+    }
+
+
+def rolling_origin_backtest(x, y, cutoffs, max_degree=9, horizon=10):
+    """
+    Rolling-origin backtest over every cutoff year x every degree 1..max_degree.
+    Training rows are folded in incrementally as each cutoff moves forward, and
+    each model is scored on the rows in (cutoff, cutoff + horizon].
+    Returns a tidy DataFrame: cutoff, degree, n_train, n_test, rmse, mae, bias.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+    cutoffs = np.sort(np.asarray(cutoffs))
+
+    # one fixed basis for the whole series so the factor can be updated in place
+    t, _, _ = scale_years(x)
+    V = design_matrix(t, max_degree)
+    P = max_degree + 1
+
+    R_aug = np.zeros((0, P + 1))
+    ends = np.searchsorted(x, cutoffs, side='right')
+    test_ends = np.searchsorted(x, cutoffs + horizon, side='right')
+    rows = []
+    start = 0
+    for cutoff, end, test_end in zip(cutoffs, ends, test_ends):
+        R_aug = _update_r(R_aug, V[start:end], y[start:end])
+        start = end
+        n_train = end
+        n_test = test_end - end
+        if n_train < 2:
+            continue
+        C, _ = _solve_degrees(R_aug, max_degree)
+        # forecast errors for every degree at once: n_test x degrees
+        err = V[end:test_end] @ C.T - y[end:test_end, None]
+        if n_test:
+            rmse = np.sqrt(np.mean(err ** 2, axis=0))
+            mae = np.mean(np.abs(err), axis=0)
+            bias = np.mean(err, axis=0)
+        else:
+            rmse = mae = bias = np.full(max_degree, np.nan)
+        for d in range(1, max_degree + 1):
+            rows.append((int(cutoff), d, int(n_train), int(n_test), rmse[d - 1], mae[d - 1], bias[d - 1]))
+
+    return pd.DataFrame(rows, columns=['cutoff', 'degree', 'n_train', 'n_test', 'rmse', 'mae', 'bias'])
+
+
+def bootstrap_bands(x, y, years, max_degree=9, n_boot=1000, levels=(2.5, 97.5),
+                    noise=True, chunk=500, seed=None, degrees=None):
+    """
+    Residual-bootstrap percentile bands for every degree 1..max_degree at the given years
+    (or only for `degrees`, e.g. [best_order], so unused degrees are never resampled).
+    Each chunk of resamples is solved as one least-squares problem with a stacked
+    right-hand side (n x chunk), so memory stays bounded for large n_boot.
+    With noise=True a resampled residual is added to each forecast (prediction band),
+    otherwise the band covers only the fitted curve.
+    Returns a tidy DataFrame: degree, year, fit, lower, median, upper.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    years = np.asarray(years, dtype=float)
+    n = len(x)
+    if degrees is not None:
+        max_degree = max(degrees)  # the QR only needs columns up to the highest requested degree
+    max_degree = min(max_degree, n - 1)
+    degrees = range(1, max_degree + 1) if degrees is None else [d for d in degrees if 1 <= d <= max_degree]
+    rng = np.random.default_rng(seed)
+
+    t, center, scale = scale_years(x)
+    Q, R = np.linalg.qr(design_matrix(t, max_degree))
+    V_f = design_matrix((years - center) / scale, max_degree)
+    qy = Q.T @ y
+
+    frames = []
+    for d in degrees:
+        k = d + 1
+        Qk = Q[:, :k]
+        fitted = Qk @ qy[:k]
+        resid = y - fitted
+        fit_f = V_f[:, :k] @ np.linalg.solve(R[:k, :k], qy[:k])
+
+        draws = np.empty((len(years), n_boot))
+        for lo in range(0, n_boot, chunk):
+            b = min(chunk, n_boot - lo)
+            # y* = fitted + resampled residuals; Q^T fitted is just qy[:k]
+            E = resid[rng.integers(0, n, size=(n, b))]
+            coef = np.linalg.solve(R[:k, :k], qy[:k, None] + Qk.T @ E)
+            pred = V_f[:, :k] @ coef
+            if noise:
+                pred += resid[rng.integers(0, n, size=pred.shape)]
+            draws[:, lo:lo + b] = pred
+
+        lower, median, upper = np.percentile(draws, [levels[0], 50, levels[1]], axis=1)
+        frames.append(pd.DataFrame({'degree': d, 'year': years, 'fit': fit_f,
+                                    'lower': lower, 'median': median, 'upper': upper}))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,179 @@
+# Local forecast server: loads the sea-level fits once and answers year queries from memory
+#
+#   python forecast_server.py --csv sea_level_data.csv --port 8765
+#   curl 'http://127.0.0.1:8765/forecast?degree=2&years=2025,2030,2040'
+#   curl -X POST http://127.0.0.1:8765/reload
+import argparse
+import asyncio
+import functools
+import json
+import os
+import signal
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+from fit_engine import evaluate
+from fitting_and_forecasting import cached_fits
+
+
+class ForecastStore:
+    """Holds the fitted models in memory and reloads them when the CSV changes."""
+
+    def __init__(self, csv_path, max_fit_year=2010, max_degree=9, cache=None):
+        self.csv_path = csv_path
+        self.max_fit_year = max_fit_year
+        self.max_degree = max_degree
+        self.cache = cache  # FitCache; None uses the default file next to the working directory
+        self.fits = None
+        self.mtime = None
+        self.reload()
+
+    def reload(self):
+        # cached_fits only refits when the CSV contents changed; the mtime is only taken on
+        # success, so a failed reload is tried again by the watcher
+        mtime = os.stat(self.csv_path).st_mtime_ns
+        self.fits = cached_fits(self.csv_path, self.max_fit_year, self.max_degree, cache=self.cache)
+        self.mtime = mtime
+        return self.fits['n']
+
+    def reload_if_changed(self):
+        if os.stat(self.csv_path).st_mtime_ns != self.mtime:
+            self.reload()
+            return True
+        return False
+
+    def forecast(self, degree, years):
+        if degree not in self.fits['coeffs']:
+            raise ValueError(f'degree must be between 1 and {len(self.fits["degrees"])}')
+        years = np.asarray(years, dtype=float)
+        return evaluate(self.fits, degree, years)  # one vectorised polyval for the whole batch
+
+
+def parse_years(params):
+    # accept ?year=2025&year=2030 and/or ?years=2025,2030
+    values = list(params.get('year', []))
+    for item in params.get('years', []):
+        values.extend(v for v in item.split(',') if v)
+    if not values:
+        raise ValueError('no years given')
+    return [float(v) for v in values]
+
+
+def handle(store, method, target, body=b''):
+    # returns (status, payload dict); kept separate from the socket code so it is easy to call directly
+    url = urlsplit(target)
+    params = parse_qs(url.query)
+    try:
+        if url.path == '/forecast':
+            if method == 'POST' and body:
+                request = json.loads(body)
+                degree, years = int(request['degree']), [float(y) for y in request['years']]
+            else:
+                degree, years = int(params.get('degree', ['2'])[0]), parse_years(params)
+            values = store.forecast(degree, years)
+            return 200, {'degree': degree, 'years': years, 'sea_level': values.tolist(),
+                         'column': store.fits['column']}
+        if url.path == '/reload' and method == 'POST':
+            return 200, {'reloaded': True, 'n': store.reload()}
+        if url.path == '/health':
+            return 200, {'ok': True, 'csv': store.csv_path, 'n': store.fits['n'],
+                         'degrees': [int(d) for d in store.fits['degrees']]}
+        return 404, {'error': f'unknown endpoint {method} {url.path}'}
+    except (ValueError, KeyError, TypeError) as e:
+        # bad query or body, e.g. {"years": 5} or a JSON list instead of an object
+        return 400, {'error': f'bad request: {e}'}
+    except Exception as e:
+        # e.g. a reload of a CSV that is missing or mid-write; the client still gets an answer
+        return 500, {'error': f'{type(e).__name__}: {e}'}
+
+
+async def serve_client(store, reader, writer):
+    # minimal HTTP/1.1 with keep-alive so clients can reuse the connection
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            body = await reader.readexactly(length) if length else b''
+
+            status, payload = handle(store, method, target, body)
+            data = json.dumps(payload).encode('utf-8')
+            reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+            writer.write(f'HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n'
+                         f'Content-Length: {len(data)}\r\n\r\n'.encode('latin-1') + data)
+            await writer.drain()
+            if headers.get('connection', '').lower() == 'close':
+                break
+    except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def safe_reload(store, changed_only=False):
+    # a failed reload (CSV missing or half written) keeps the old fits and is retried later
+    try:
+        if changed_only:
+            return store.reload_if_changed()
+        store.reload()
+        return True
+    except Exception as e:
+        print(f'Reload of {store.csv_path} failed, keeping the previous fits: {type(e).__name__}: {e}')
+        return False
+
+
+async def watch_csv(store, interval):
+    # reload hook: pick up CSV changes without restarting the server
+    while True:
+        await asyncio.sleep(interval)
+        if safe_reload(store, changed_only=True):
+            print(f'Reloaded fits from {store.csv_path}')
+
+
+async def main_async(args):
+    store = ForecastStore(args.csv, args.max_fit_year, args.max_degree)
+    client = functools.partial(serve_client, store)
+    if args.unix:
+        server = await asyncio.start_unix_server(client, path=args.unix)
+        where = args.unix
+    else:
+        server = await asyncio.start_server(client, args.host, args.port)
+        where = f'http://{args.host}:{args.port}'
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, safe_reload, store)  # `kill -HUP <pid>` also reloads
+    except (NotImplementedError, AttributeError):
+        pass  # no SIGHUP on Windows
+    if args.watch > 0:
+        loop.create_task(watch_csv(store, args.watch))
+
+    print(f'Serving sea-level forecasts on {where}')
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Serve sea-level forecasts from precomputed polynomial fits.')
+    ap.add_argument('--csv', default='sea_level_data.csv', help='Path to sea_level_data.csv')
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--unix', default=None, help='Serve on this Unix socket path instead of TCP')
+    ap.add_argument('--max-fit-year', type=int, default=2010)
+    ap.add_argument('--max-degree', type=int, default=9)
+    ap.add_argument('--watch', type=float, default=2.0, help='Seconds between CSV change checks (0 to disable)')
+    args = ap.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
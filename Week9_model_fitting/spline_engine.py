@@ -0,0 +1,137 @@
+# Cubic regression-spline engine: piecewise cubics on uniform knots, solved with banded normal equations
+import numpy as np
+import pandas as pd
+
+EPS = 1e-12
+BAND = 4  # a cubic B-spline row touches 4 neighbouring coefficients
+
+
+def _basis(x, x0, h, n_segments):
+    # segment index and the 4 non-zero uniform cubic B-spline values for every x;
+    # points outside the knot range extend the first/last segment's cubic (used for forecasting)
+    s = (np.asarray(x, dtype=float) - x0) / h
+    j = np.clip(np.floor(s), 0, n_segments - 1).astype(np.int64)
+    u = s - j
+    u2, u3 = u * u, u * u * u
+    vals = np.column_stack([
+        (1 - u) ** 3 / 6,
+        (3 * u3 - 6 * u2 + 4) / 6,
+        (-3 * u3 + 3 * u2 + 3 * u + 1) / 6,
+        u3 / 6,
+    ])
+    return j, vals
+
+
+def _banded_cholesky_solve(band, rhs):
+    # solve G c = rhs where band[i, o] = G[i, i + o] (symmetric, o = 0..BAND-1); O(P) for fixed bandwidth
+    P = band.shape[0]
+    w = band.shape[1]
+    L = np.zeros_like(band)  # L[i, o] = lower factor entry (i, i - o)
+    for i in range(P):
+        for o in range(min(w - 1, i), 0, -1):
+            r = i - o
+            acc = band[r, o]
+            for m in range(1, w - o):
+                if r - m < 0:
+                    break
+                acc -= L[i, o + m] * L[r, m]
+            L[i, o] = acc / L[r, 0]
+        d = band[i, 0] - np.sum(L[i, 1:min(w, i + 1)] ** 2)
+        L[i, 0] = np.sqrt(max(d, EPS))
+
+    # forward then backward substitution
+    z = np.zeros(P)
+    for i in range(P):
+        acc = rhs[i]
+        for o in range(1, min(w, i + 1)):
+            acc -= L[i, o] * z[i - o]
+        z[i] = acc / L[i, 0]
+    c = np.zeros(P)
+    for i in range(P - 1, -1, -1):
+        acc = z[i]
+        for o in range(1, min(w, P - i)):
+            acc -= L[i + o, o] * c[i + o]
+        c[i] = acc / L[i, 0]
+    return c
+
+
+def fit_spline(x, y, n_segments, sigma=None, ridge=1e-10):
+    """
+    Least-squares cubic spline with n_segments uniform pieces (n_segments + 3 parameters).
+    Building the banded normal equations is O(n) and the solve is O(n_segments), so
+    this scales to millions of points without a dense design matrix.
+    Returns a dict with the same statistics as fit_all_degrees (rss, chi-square,
+    reduced chi-square, BIC) for a single model.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    P = n_segments + 3
+    if n < P:
+        raise ValueError(f'Need at least {P} points for {n_segments} segments')
+
+    x0 = float(x.min())
+    h = (float(x.max()) - x0) / n_segments or 1.0
+    j, vals = _basis(x, x0, h, n_segments)
+
+    # accumulate the banded Gram matrix and right-hand side with bincount (no n x P matrix)
+    band = np.zeros((P, BAND))
+    rhs = np.zeros(P)
+    for a in range(BAND):
+        rhs += np.bincount(j + a, weights=vals[:, a] * y, minlength=P)
+        for b in range(a, BAND):
+            band[:, b - a] += np.bincount(j + a, weights=vals[:, a] * vals[:, b], minlength=P)
+    # tiny ridge keeps segments without data solvable
+    band[:, 0] += ridge * max(band[:, 0].max(), 1.0)
+
+    coeffs = _banded_cholesky_solve(band, rhs)
+    fitted = np.sum(vals * coeffs[j[:, None] + np.arange(BAND)], axis=1)
+    residuals = y - fitted
+    rss = float(residuals @ residuals)
+
+    if sigma is None:
+        sigma = np.std(y - np.mean(y))
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=float), y.shape)
+    chi_square = float(np.sum(residuals ** 2 / sigma ** 2))
+    dof = n - P
+    return {
+        'n_segments': n_segments,
+        'x0': x0,
+        'h': h,
+        'coeffs': coeffs,
+        'k': P,
+        'residuals': residuals,
+        'rss': rss,
+        'chi_square': chi_square,
+        'reduced_chi_square': chi_square / dof if dof > 0 else np.nan,
+        'bic': n * np.log(rss / n + EPS) + P * np.log(n),
+        'n': n,
+    }
+
+
+def evaluate_spline(model, years):
+    j, vals = _basis(years, model['x0'], model['h'], model['n_segments'])
+    return np.sum(vals * model['coeffs'][j[:, None] + np.arange(BAND)], axis=1)
+
+
+def fit_spline_range(x, y, segments=range(1, 21), sigma=None):
+    # fit a spline for every requested number of segments (skipping ones with too few points)
+    fits = {}
+    for s in segments:
+        if len(x) >= s + 3:
+            fits[s] = fit_spline(x, y, s, sigma=sigma)
+    return fits
+
+
+def ranking_table(poly_fits=None, spline_fits=None):
+    # rank polynomial (fit_all_degrees) and spline fits together by BIC, with the same statistics
+    rows = []
+    if poly_fits is not None:
+        for d in poly_fits['degrees']:
+            rows.append(('polynomial', f'degree {d}', d + 1, poly_fits['rss'][d - 1],
+                         poly_fits['reduced_chi_square'][d - 1], poly_fits['bic'][d - 1]))
+    if spline_fits is not None:
+        for s, m in spline_fits.items():
+            rows.append(('cubic spline', f'{s} segments', m['k'], m['rss'], m['reduced_chi_square'], m['bic']))
+    table = pd.DataFrame(rows, columns=['engine', 'model', 'params', 'rss', 'reduced_chi_square', 'bic'])
+    return table.sort_values('bic', ignore_index=True)
@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from fit_engine import fit_all_degrees, evaluate
+from fitting_and_forecasting import append_observations
+
+HEADER = 'Year,CSIRO Adjusted Sea Level (mm)\n'
+
+
+def saved_meta(state_path):
+    with np.load(state_path) as saved:
+        return json.loads(str(saved['meta']))
+
+
+def level(year):
+    return 0.01 * (year - 1900) ** 2 + 1.5 * (year - 1900) + 3 * np.sin(year)
+
+
+class TestAppendObservations(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.csv_path = os.path.join(self.tmp, 'sea_level.csv')
+        self.state_path = os.path.join(self.tmp, 'state.npz')
+        with open(self.csv_path, 'w') as f:
+            f.write(HEADER + ''.join(f'{y},{level(y):.6f}\n' for y in range(1900, 1990)))
+
+    def check_matches_full_refit(self, fits):
+        data = np.loadtxt(self.csv_path, delimiter=',', skiprows=1)
+        fresh = fit_all_degrees(data[:, 0], data[:, 1], 5)
+        self.assertEqual(fits['n'], len(data))
+        years = np.arange(1900, 2031)
+        for d in fresh['degrees']:
+            # the stored state keeps the first call's year scaling, so compare the fitted curves
+            np.testing.assert_allclose(evaluate(fits, d, years), evaluate(fresh, d, years), rtol=1e-7, atol=1e-7)
+        np.testing.assert_allclose(fits['rss'], fresh['rss'], rtol=1e-6)
+
+    def test_incremental_matches_full_refit(self):
+        fits, _ = append_observations(self.csv_path, self.state_path, max_degree=5)
+        self.check_matches_full_refit(fits)
+
+        # append rows, the last one without a trailing newline
+        with open(self.csv_path, 'a') as f:
+            f.write(''.join(f'{y},{level(y):.6f}\n' for y in range(1990, 2000)) + f'2000,{level(2000):.6f}')
+        offset_before = saved_meta(self.state_path)['offset']
+        fits, forecast = append_observations(self.csv_path, self.state_path, max_degree=5)
+        self.check_matches_full_refit(fits)
+        self.assertEqual(forecast['year'].tolist(), list(range(2001, 2011)))
+
+        # the writer finishes that line and adds more; only the new bytes are read
+        with open(self.csv_path, 'a') as f:
+            f.write(''.join(f'\n{y},{level(y):.6f}' for y in range(2001, 2005)) + '\n')
+        fits, _ = append_observations(self.csv_path, self.state_path, max_degree=5)
+        self.check_matches_full_refit(fits)
+        meta = saved_meta(self.state_path)
+        self.assertGreater(meta['offset'], offset_before)
+        self.assertEqual((meta['n'], meta['offset']), (105, os.path.getsize(self.csv_path)))
+
+    def test_state_roundtrip_and_rewritten_file(self):
+        first, _ = append_observations(self.csv_path, self.state_path, max_degree=5)
+        again, _ = append_observations(self.csv_path, self.state_path, max_degree=5)  # nothing new
+        np.testing.assert_allclose(again['bic'], first['bic'])
+        # an edited (not appended) file no longer matches the stored tail, so it is rebuilt
+        with open(self.csv_path, 'w') as f:
+            f.write(HEADER + ''.join(f'{y},{level(y) + 1:.6f}\n' for y in range(1900, 1980)))
+        fits, _ = append_observations(self.csv_path, self.state_path, max_degree=5)
+        self.check_matches_full_refit(fits)
+
+
+if __name__ == '__main__':
+    unittest.main()
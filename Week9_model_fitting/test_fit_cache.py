@@ -0,0 +1,78 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from fit_cache import FitCache, make_key
+import fitting_and_forecasting
+
+
+class TestFitCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, 'cache.json')
+        self.csv_path = os.path.join(self.tmp.name, 'data.csv')
+        with open(self.csv_path, 'w') as f:
+            f.write('Year,level\n2000,1.0\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        cache = FitCache(self.cache_path)
+        key = make_key(cache.csv_hash(self.csv_path), 'level', 2, 2010)
+        cache.put(key, {'bic': 1.5})
+        cache.save()
+        self.assertEqual(FitCache(self.cache_path).get(key), {'bic': 1.5})
+
+    def test_lru_eviction(self):
+        cache = FitCache(self.cache_path, max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')  # 'b' is now least recently used
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_recent_read_survives_eviction_across_runs(self):
+        cache = FitCache(self.cache_path, max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.save()
+        time.sleep(0.01)
+        reader = FitCache(self.cache_path, max_entries=2)  # a later run that only reads 'a'
+        self.assertEqual(reader.get('a'), 1)
+        self.assertTrue(reader.dirty)
+        reader.save()
+        time.sleep(0.01)
+        writer = FitCache(self.cache_path, max_entries=2)
+        writer.put('c', 3)
+        self.assertEqual(sorted(writer.entries), ['a', 'c'])  # 'b' was least recently used, not 'a'
+
+    def test_changed_file_invalidates(self):
+        cache = FitCache(self.cache_path)
+        old_key = make_key(cache.csv_hash(self.csv_path), 'level', 1, 2010)
+        cache.put(old_key, 'old fit')
+        with open(self.csv_path, 'a') as f:
+            f.write('2001,2.0\n')
+        os.utime(self.csv_path, ns=(0, 0))  # make sure the stat check sees a change
+        new_key = make_key(cache.csv_hash(self.csv_path), 'level', 1, 2010)
+        self.assertNotEqual(old_key, new_key)
+        self.assertIsNone(cache.get(old_key))
+        self.assertIsNone(cache.get(new_key))
+
+    def test_short_series_hits_on_second_call(self):
+        # 4 rows only fit degrees 1..3, so the degrees 4..9 asked for must not be looked up
+        with open(self.csv_path, 'w') as f:
+            f.write('Year,CSIRO Adjusted Sea Level (mm)\n2000,1.0\n2001,2.5\n2002,2.0\n2003,4.0\n')
+        first = fitting_and_forecasting.cached_fits(self.csv_path, max_degree=9, cache=FitCache(self.cache_path))
+        self.assertEqual(first['degrees'].tolist(), [1, 2, 3])
+        with mock.patch.object(fitting_and_forecasting, 'fit_all_degrees', side_effect=AssertionError('refit')):
+            second = fitting_and_forecasting.cached_fits(self.csv_path, max_degree=9, cache=FitCache(self.cache_path))
+        self.assertEqual(second['degrees'].tolist(), [1, 2, 3])
+        self.assertEqual(second['bic'].tolist(), first['bic'].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import numpy as np
+from fit_engine import (fit_all_degrees, evaluate, residual_sigma, rolling_origin_backtest, bootstrap_bands,
+                        fit_all_series, iter_degree_fits, select_model, model_from_fits, predict,
+                        init_stats, append_stats, stats_fits)
+
+
+class TestFitEngine(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.repeat(np.arange(1880, 2011), 4).astype(float)
+        self.y = 0.01 * (self.x - 1880) ** 2 + 1.5 * (self.x - 1880) - 180 + rng.normal(0, 3, len(self.x))
+
+    def test_matches_polyfit(self):
+        fits = fit_all_degrees(self.x, self.y, 5)
+        for d in range(1, 6):
+            coeffs = np.polyfit(self.x - 1945, self.y, d)
+            expected = np.polyval(coeffs, self.x - 1945)
+            np.testing.assert_allclose(evaluate(fits, d, self.x), expected, atol=1e-6)
+            rss = np.sum((self.y - expected) ** 2)
+            self.assertAlmostEqual(fits['rss'][d - 1], rss, delta=1e-6 * rss)
+
+    def test_statistics(self):
+        fits = fit_all_degrees(self.x, self.y, 9)
+        n = len(self.x)
+        # RSS never increases as the model grows
+        self.assertTrue(np.all(np.diff(fits['rss']) <= 1e-8))
+        self.assertAlmostEqual(fits['bic'][1], n * np.log(fits['rss'][1] / n + 1e-12) + 3 * np.log(n))
+        self.assertAlmostEqual(residual_sigma(fits, 2), 3, delta=0.5)
+
+    def test_high_degree_is_stable(self):
+        # degree 20 on raw calendar years would be hopeless with np.polyfit
+        fits = fit_all_degrees(self.x, self.y, 20)
+        self.assertTrue(np.all(np.isfinite(fits['bic'])))
+        self.assertLess(np.max(np.abs(fits['residuals'][:, 19])), 20)
+
+    def test_backtest_matches_refitting(self):
+        results = rolling_origin_backtest(self.x, self.y, [1950, 1990], 4, horizon=10)
+        self.assertEqual(len(results), 2 * 4)
+        for cutoff in (1950, 1990):
+            train = self.x <= cutoff
+            test = (self.x > cutoff) & (self.x <= cutoff + 10)
+            for d in range(1, 5):
+                coeffs = np.polyfit(self.x[train] - 1945, self.y[train], d)
+                err = np.polyval(coeffs, self.x[test] - 1945) - self.y[test]
+                row = results[(results['cutoff'] == cutoff) & (results['degree'] == d)].iloc[0]
+                self.assertAlmostEqual(row['rmse'], np.sqrt(np.mean(err ** 2)), places=5)
+                self.assertEqual(row['n_test'], test.sum())
+
+    def test_bootstrap_bands(self):
+        years = np.arange(2011, 2021)
+        bands = bootstrap_bands(self.x, self.y, years, 3, n_boot=2000, chunk=300, seed=1)
+        self.assertEqual(len(bands), 3 * len(years))
+        self.assertTrue(np.all(bands['lower'] <= bands['median']))
+        self.assertTrue(np.all(bands['median'] <= bands['upper']))
+        quad = bands[bands['degree'] == 2]
+        # prediction band for sigma=3 noise should be roughly +/- 2 sigma wide
+        width = (quad['upper'] - quad['lower']).to_numpy()
+        self.assertTrue(np.all((width > 8) & (width < 20)))
+        np.testing.assert_allclose(quad['median'], quad['fit'], atol=1.0)
+        # single-degree mode: same fitted curve, only that degree resampled
+        only = bootstrap_bands(self.x, self.y, years, n_boot=500, seed=1, degrees=[2])
+        self.assertEqual(only['degree'].unique().tolist(), [2])
+        np.testing.assert_allclose(only['fit'], quad['fit'])
+
+    def test_fit_all_series(self):
+        y2 = 0.5 * self.y
+        y3 = self.y.copy()
+        y3[:100] = np.nan  # shorter record with its own mask
+        Y = np.column_stack([self.y, y2, y3])
+        table = fit_all_series(self.x, Y, ['a', 'b', 'c'], 3)
+        self.assertEqual(len(table), 3 * 3)
+        for name, y in (('a', self.y), ('b', y2), ('c', y3)):
+            keep = ~np.isnan(y)
+            fits = fit_all_degrees(self.x[keep], y[keep], 3)
+            rows = table[table['series'] == name].sort_values('degree')
+            self.assertTrue(np.all(rows['n'] == keep.sum()))
+            np.testing.assert_allclose(rows['bic'], fits['bic'])
+            np.testing.assert_allclose(rows['c2'].iloc[1], fits['coeffs'][2][0])
+
+    def test_lazy_fits_match_batch(self):
+        fits = fit_all_degrees(self.x, self.y, 6)
+        for model in iter_degree_fits(self.x, self.y, 6):
+            d = model['degree']
+            self.assertAlmostEqual(model['bic'], fits['bic'][d - 1], places=6)
+            np.testing.assert_allclose(predict(model, self.x), evaluate(fits, d, self.x), atol=1e-8)
+
+    def test_select_model_stops_early(self):
+        best, bics = select_model(self.x, self.y, 20, patience=2)
+        self.assertEqual(best['degree'], 2)
+        # quadratic truth: BIC rises after degree 2, so high degrees are never fitted
+        self.assertLess(max(bics), 20)
+        self.assertEqual(best['bic'], min(bics.values()))
+
+    def test_model_from_fits_matches_select_model(self):
+        best, _ = select_model(self.x, self.y, 9, patience=2)
+        model = model_from_fits(fit_all_degrees(self.x, self.y, 9), best['degree'])
+        years = np.linspace(self.x.min(), self.x.max() + 10, 7)
+        np.testing.assert_allclose(predict(model, years), predict(best, years))
+        np.testing.assert_allclose(model['residuals'], best['residuals'], atol=1e-9)
+        self.assertAlmostEqual(model['bic'], best['bic'])
+        with self.assertRaises(ValueError):
+            model_from_fits(fit_all_degrees(self.x, self.y, 3), 4)
+
+    def test_append_matches_full_fit(self):
+        state = init_stats(self.x[:300], self.y[:300], 6)
+        append_stats(state, self.x[300:400], self.y[300:400])
+        append_stats(state, self.x[400:], self.y[400:])
+        fits = stats_fits(state)
+        full = fit_all_degrees(self.x, self.y, 6)
+        self.assertEqual(state['n'], len(self.x))
+        np.testing.assert_allclose(fits['bic'], full['bic'])
+        np.testing.assert_allclose(fits['reduced_chi_square'], full['reduced_chi_square'])
+        np.testing.assert_allclose(evaluate(fits, 6, self.x), evaluate(full, 6, self.x), atol=1e-8)
+
+    def test_too_few_points(self):
+        with self.assertRaises(ValueError):
+            fit_all_degrees([2000], [1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
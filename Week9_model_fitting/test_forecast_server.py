@@ -0,0 +1,61 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from fit_cache import FitCache
+from forecast_server import ForecastStore, handle, safe_reload
+
+
+class TestForecastServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.csv_path = os.path.join(self.tmp, 'sea_level.csv')
+        years = np.arange(1900, 2011)
+        with open(self.csv_path, 'w') as f:
+            f.write('Year,CSIRO Adjusted Sea Level (mm)\n')
+            for year in years:
+                f.write(f'{year},{0.01 * (year - 1900) ** 2 + 1.5 * (year - 1900):.4f}\n')
+        self.store = ForecastStore(self.csv_path, cache=FitCache(os.path.join(self.tmp, 'cache.json')))
+
+    def test_forecast_get_and_post(self):
+        status, payload = handle(self.store, 'GET', '/forecast?degree=2&years=2020,2030&year=2040')
+        self.assertEqual(status, 200)
+        self.assertEqual(payload['years'], [2040.0, 2020.0, 2030.0])  # ?year= values first
+        np.testing.assert_allclose(payload['sea_level'][1], 0.01 * 120 ** 2 + 1.5 * 120, rtol=1e-6)
+        body = json.dumps({'degree': 2, 'years': [2040, 2020, 2030]}).encode()
+        status, posted = handle(self.store, 'POST', '/forecast', body)
+        self.assertEqual(status, 200)
+        self.assertEqual(posted['sea_level'], payload['sea_level'])
+
+    def test_health_reload_and_unknown(self):
+        status, payload = handle(self.store, 'GET', '/health')
+        self.assertEqual((status, payload['n'], payload['degrees'][-1]), (200, 111, 9))
+        self.assertEqual(handle(self.store, 'POST', '/reload'), (200, {'reloaded': True, 'n': 111}))
+        self.assertEqual(handle(self.store, 'GET', '/nope')[0], 404)
+
+    def test_bad_input_is_400(self):
+        for method, target, body in [('GET', '/forecast?degree=2', b''),
+                                     ('GET', '/forecast?degree=99&years=2020', b''),
+                                     ('GET', '/forecast?degree=two&years=2020', b''),
+                                     ('POST', '/forecast', b'not json'),
+                                     ('POST', '/forecast', b'{"degree": 2, "years": 5}'),
+                                     ('POST', '/forecast', b'[1]'),
+                                     ('POST', '/forecast', b'{"degree": 2}')]:
+            status, payload = handle(self.store, method, target, body)
+            self.assertEqual(status, 400, (target, body))
+            self.assertIn('error', payload)
+
+    def test_failed_reload_is_500_and_keeps_fits(self):
+        os.remove(self.csv_path)
+        status, payload = handle(self.store, 'POST', '/reload')
+        self.assertEqual(status, 500)
+        self.assertIn('FileNotFoundError', payload['error'])
+        self.assertFalse(safe_reload(self.store, changed_only=True))  # watcher logs and carries on
+        self.assertEqual(handle(self.store, 'GET', '/forecast?years=2020')[0], 200)  # previous fits still served
+
+
+if __name__ == '__main__':
+    unittest.main()
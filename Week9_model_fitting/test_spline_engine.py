@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+from spline_engine import fit_spline, evaluate_spline, fit_spline_range, ranking_table
+from fit_engine import fit_all_degrees
+
+
+class TestSplineEngine(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.x = np.sort(rng.uniform(1880, 2010, 600))
+        self.y = 30 * np.sin((self.x - 1880) / 20) + rng.normal(0, 2, len(self.x))
+
+    def test_reproduces_cubic(self):
+        # a single cubic is exactly representable by any uniform cubic spline
+        y = 1e-4 * (self.x - 1950) ** 3 - 0.02 * (self.x - 1950) ** 2 + self.x
+        model = fit_spline(self.x, y, 7)
+        np.testing.assert_allclose(evaluate_spline(model, self.x), y, atol=1e-5)
+        self.assertLess(model['rss'], 1e-6)
+
+    def test_matches_dense_least_squares(self):
+        model = fit_spline(self.x, self.y, 10, ridge=0)
+        # dense design matrix built from the spline evaluated at unit coefficients
+        B = np.column_stack([evaluate_spline(dict(model, coeffs=np.eye(13)[i]), self.x) for i in range(13)])
+        coeffs = np.linalg.lstsq(B, self.y, rcond=None)[0]
+        np.testing.assert_allclose(model['coeffs'], coeffs, atol=1e-8)
+
+    def test_ranking_prefers_spline_for_wiggly_data(self):
+        poly_fits = fit_all_degrees(self.x, self.y, 9)
+        spline_fits = fit_spline_range(self.x, self.y, range(1, 16))
+        table = ranking_table(poly_fits, spline_fits)
+        self.assertEqual(len(table), 9 + 15)
+        self.assertEqual(table['engine'].iloc[0], 'cubic spline')
+        self.assertTrue(table['bic'].is_monotonic_increasing)
+
+    def test_too_few_points(self):
+        with self.assertRaises(ValueError):
+            fit_spline([2000, 2001, 2002], [1.0, 2.0, 3.0], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()